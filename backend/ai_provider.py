@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import os
+import random
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+
+class ChatProvider:
+    """Base class for the model backends behind /api/chat"""
+
+    name = 'base'
+
+    async def stream(self, message: str, history: Optional[List[Dict[str, str]]] = None) -> AsyncIterator[str]:
+        """Yield the response as text chunks as they are produced"""
+        raise NotImplementedError
+
+    async def complete(self, message: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Return the full response text"""
+        return ''.join([chunk async for chunk in self.stream(message, history)])
+
+    async def close(self):
+        """Release any resources held by the provider"""
+
+
+class LocalProvider(ChatProvider):
+    """Deterministic offline provider for development and tests
+
+    Answers with the same placeholder text the chat route used before a
+    model was wired in, one word per chunk, optionally pausing between words
+    to mimic token latency.
+    """
+
+    name = 'local'
+
+    def __init__(self, token_delay: float = 0.0):
+        self.token_delay = token_delay
+
+    async def stream(self, message: str, history: Optional[List[Dict[str, str]]] = None) -> AsyncIterator[str]:
+        words = f"Resposta da IA para: {message}".split(' ')
+        for i, word in enumerate(words):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield word if i == len(words) - 1 else word + ' '
+
+
+class ProviderError(Exception):
+    """Raised when the model backend cannot produce a response"""
+
+
+class OpenAICompatibleProvider(ChatProvider):
+    """Chat completions over any OpenAI-compatible HTTP API
+
+    All requests share one httpx.AsyncClient so connections are kept alive
+    and pooled, and a semaphore caps how many completions run at once in
+    this process. Failed requests are retried with jittered exponential
+    backoff as long as no chunk has been sent to the caller yet.
+    """
+
+    name = 'openai'
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = 'https://api.openai.com/v1',
+        model: str = 'gpt-4o-mini',
+        system_prompt: Optional[str] = None,
+        max_concurrency: int = 20,
+        queue_timeout: float = 5.0,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.25,
+        max_connections: int = 50,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.system_prompt = system_prompt
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            headers={'Authorization': f"Bearer {api_key}"},
+        )
+
+    def _messages(self, message: str, history: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        messages = []
+        if self.system_prompt:
+            messages.append({'role': 'system', 'content': self.system_prompt})
+        messages.extend(history or [])
+        messages.append({'role': 'user', 'content': message})
+        return messages
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform between 0 and base * 2^attempt
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    async def stream(self, message: str, history: Optional[List[Dict[str, str]]] = None) -> AsyncIterator[str]:
+        payload = {
+            'model': self.model,
+            'messages': self._messages(message, history),
+            'stream': True,
+        }
+
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ProviderError("Too many concurrent AI requests")
+
+        try:
+            attempt = 0
+            while True:
+                sent_any = False
+                try:
+                    async with self._client.stream(
+                        'POST', f"{self.base_url}/chat/completions", json=payload
+                    ) as response:
+                        if response.status_code == 429 or response.status_code >= 500:
+                            raise ProviderError(f"AI provider returned {response.status_code}")
+                        if response.status_code >= 400:
+                            body = await response.aread()
+                            # Client errors are not retried
+                            raise ValueError(f"AI provider returned {response.status_code}: {body[:200]!r}")
+
+                        async for line in response.aiter_lines():
+                            if not line.startswith('data:'):
+                                continue
+                            data = line[len('data:'):].strip()
+                            if data == '[DONE]':
+                                return
+                            choices = json.loads(data).get('choices') or []
+                            content = choices[0].get('delta', {}).get('content') if choices else None
+                            if content:
+                                sent_any = True
+                                yield content
+                        return
+                except (httpx.TransportError, ProviderError) as e:
+                    if sent_any or attempt >= self.max_retries:
+                        raise ProviderError(f"AI request failed: {e}")
+                    delay = self._backoff(attempt)
+                    logging.warning(f"AI request failed ({e}), retrying in {delay:.2f}s")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                except ValueError as e:
+                    raise ProviderError(str(e))
+        finally:
+            self._semaphore.release()
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def provider_from_env() -> ChatProvider:
+    """Build the provider selected by AI_PROVIDER (default: local)"""
+    name = os.environ.get('AI_PROVIDER', 'local').lower()
+    if name == 'local':
+        return LocalProvider(token_delay=float(os.environ.get('AI_LOCAL_TOKEN_DELAY', '0')))
+    if name == 'openai':
+        api_key = os.environ.get('OPENAI_API_KEY')
+        if not api_key:
+            raise Exception("AI_PROVIDER=openai requires OPENAI_API_KEY")
+        return OpenAICompatibleProvider(
+            api_key=api_key,
+            base_url=os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1'),
+            model=os.environ.get('OPENAI_MODEL', 'gpt-4o-mini'),
+            system_prompt=os.environ.get('AI_SYSTEM_PROMPT'),
+            max_concurrency=int(os.environ.get('AI_MAX_CONCURRENCY', '20')),
+            queue_timeout=float(os.environ.get('AI_QUEUE_TIMEOUT', '5')),
+            timeout=float(os.environ.get('AI_TIMEOUT', '30')),
+            max_retries=int(os.environ.get('AI_MAX_RETRIES', '2')),
+            max_connections=int(os.environ.get('AI_MAX_CONNECTIONS', '50')),
+        )
+    raise Exception(f"Unknown AI_PROVIDER: {name}")
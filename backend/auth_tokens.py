@@ -0,0 +1,94 @@
+import logging
+import os
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import jwt
+
+
+class TokenError(Exception):
+    """Token is missing, malformed, expired or of the wrong type"""
+
+
+class TokenService:
+    """Issues and verifies signed access/refresh tokens without touching the database
+
+    The signing key is prepared once at construction, and successfully
+    verified access tokens are kept in a small LRU until they expire, so a
+    client reusing its token pays for one signature check.
+    """
+
+    def __init__(self, secret: str, algorithm: str = 'HS256', access_ttl: int = 900,
+                 refresh_ttl: int = 30 * 24 * 3600, verified_cache_size: int = 10000,
+                 public_key: Optional[str] = None):
+        self.algorithm = algorithm
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+        self.verified_cache_size = verified_cache_size
+        algorithm_impl = jwt.get_algorithm_by_name(algorithm)
+        self._signing_key = algorithm_impl.prepare_key(secret)
+        self._verifying_key = algorithm_impl.prepare_key(public_key) if public_key else self._signing_key
+        # token -> claims, for access tokens that already passed verification
+        self._verified: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+
+    def _issue(self, user_id: str, token_type: str, ttl: int, **claims) -> str:
+        now = int(time.time())
+        payload = {
+            'sub': user_id,
+            'type': token_type,
+            'iat': now,
+            'exp': now + ttl,
+            'jti': uuid.uuid4().hex,
+            **claims,
+        }
+        return jwt.encode(payload, self._signing_key, algorithm=self.algorithm)
+
+    def issue_access(self, user_id: str, **claims) -> str:
+        return self._issue(user_id, 'access', self.access_ttl, **claims)
+
+    def issue_refresh(self, user_id: str, **claims) -> str:
+        return self._issue(user_id, 'refresh', self.refresh_ttl, **claims)
+
+    def verify(self, token: str, token_type: str = 'access') -> Dict[str, Any]:
+        """Return the claims of a valid token or raise TokenError"""
+        # Only access tokens are cached; a cached one is never accepted as another type
+        claims = self._verified.get(token) if token_type == 'access' else None
+        if claims is not None:
+            if claims['exp'] > time.time():
+                self._verified.move_to_end(token)
+                return claims
+            del self._verified[token]
+
+        try:
+            claims = jwt.decode(
+                token, self._verifying_key, algorithms=[self.algorithm],
+                options={'require': ['sub', 'exp', 'type']},
+            )
+        except jwt.PyJWTError as e:
+            raise TokenError(str(e))
+        if claims.get('type') != token_type:
+            raise TokenError(f"Expected a {token_type} token")
+
+        if token_type == 'access':
+            self._verified[token] = claims
+            if len(self._verified) > self.verified_cache_size:
+                self._verified.popitem(last=False)
+        return claims
+
+
+def token_service_from_env() -> TokenService:
+    """JWT_SECRET signs tokens (JWT_PUBLIC_KEY verifies them for RS*/ES* algorithms)"""
+    secret = os.environ.get('JWT_SECRET')
+    if not secret:
+        logging.warning("JWT_SECRET is not set; tokens will not survive restarts or work across workers")
+        secret = secrets.token_urlsafe(32)
+    return TokenService(
+        secret,
+        algorithm=os.environ.get('JWT_ALGORITHM', 'HS256'),
+        access_ttl=int(os.environ.get('JWT_ACCESS_TTL', '900')),
+        refresh_ttl=int(os.environ.get('JWT_REFRESH_TTL', str(30 * 24 * 3600))),
+        public_key=os.environ.get('JWT_PUBLIC_KEY'),
+    )
@@ -0,0 +1,81 @@
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) without a tokenizer"""
+    return len(text) // 4 + 1
+
+
+class ConversationContext:
+    """Builds the prior turns sent to the model for a chat session
+
+    Only the last `max_turns` turns are read, newest-first through the
+    (session_id, timestamp) index, and kept in a per-session ring buffer so
+    consecutive messages in a session don't query the database again.
+    Buffers are dropped after `ttl` seconds so turns written by other
+    workers are eventually picked up, and at most `max_sessions` are kept.
+    """
+
+    def __init__(self, client, max_turns: int = 10, token_budget: int = 2000,
+                 max_sessions: int = 1000, ttl: float = 300):
+        self.client = client
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        # session_id -> (loaded_at, ring buffer of (message, response))
+        self._sessions: 'OrderedDict[str, Tuple[float, Deque[Tuple[str, str]]]]' = OrderedDict()
+
+    async def _turns(self, session_id: str) -> Deque[Tuple[str, str]]:
+        entry = self._sessions.get(session_id)
+        if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+        rows, _ = await self.client.find_many(
+            'chat_messages', {'session_id': session_id},
+            columns=['message', 'response'],
+            order_by='timestamp', descending=True, limit=self.max_turns,
+        )
+        turns = deque(((row['message'], row['response']) for row in reversed(rows)), maxlen=self.max_turns)
+        self._sessions[session_id] = (time.monotonic(), turns)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return turns
+
+    async def build(self, session_id: str) -> List[Dict[str, str]]:
+        """Return prior turns as chat messages, oldest first, within the token budget"""
+        turns = await self._turns(session_id)
+        messages: List[Dict[str, str]] = []
+        used = 0
+        # Walk newest to oldest so the most recent turns survive trimming
+        for message, response in reversed(turns):
+            cost = estimate_tokens(message) + estimate_tokens(response)
+            if used + cost > self.token_budget:
+                break
+            used += cost
+            messages[:0] = [
+                {'role': 'user', 'content': message},
+                {'role': 'assistant', 'content': response},
+            ]
+        return messages
+
+    def record(self, session_id: str, message: str, response: str):
+        """Append a completed turn to the session buffer if it is loaded"""
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            entry[1].append((message, response))
+
+
+def chat_context_from_env(client) -> ConversationContext:
+    return ConversationContext(
+        client,
+        max_turns=int(os.environ.get('CHAT_CONTEXT_TURNS', '10')),
+        token_budget=int(os.environ.get('CHAT_CONTEXT_TOKEN_BUDGET', '2000')),
+        max_sessions=int(os.environ.get('CHAT_CONTEXT_MAX_SESSIONS', '1000')),
+        ttl=float(os.environ.get('CHAT_CONTEXT_TTL', '300')),
+    )
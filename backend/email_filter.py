@@ -0,0 +1,134 @@
+import asyncio
+import hashlib
+import logging
+import math
+import os
+
+from storage import normalize_email
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class EmailFilter:
+    """Bloom filter of registered emails used to skip lookups for unknown addresses
+
+    Built by streaming users.email at startup and rebuilt every
+    `refresh_interval` seconds so emails registered through other workers
+    are picked up. Inserts seen by this process are added immediately.
+    Until the first build finishes every email is treated as possibly
+    present, so the database stays the source of truth.
+
+    Between rebuilds an email registered on another worker reads as absent,
+    so only use the filter where a miss is caught anyway, like the
+    register duplicate check backed by the UNIQUE key on users.email.
+    """
+
+    def __init__(self, client, capacity: int = 1_000_000, error_rate: float = 0.01,
+                 refresh_interval: float = 300):
+        self.client = client
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self._filter = None
+        # Filter being built; inserts seen meanwhile are added to it too
+        self._pending = None
+        self._task = None
+        self.skipped_lookups = 0
+        client.add_write_listener(self._on_write)
+
+    def might_contain(self, email: str) -> bool:
+        if self._filter is None:
+            return True
+        if normalize_email(email) in self._filter:
+            return True
+        self.skipped_lookups += 1
+        return False
+
+    async def build(self):
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        self._pending = bloom
+        try:
+            async for rows in self.client.stream('users', columns=['email']):
+                for row in rows:
+                    bloom.add(normalize_email(row['email']))
+        finally:
+            self._pending = None
+        if bloom.count > self.capacity:
+            logging.warning(
+                f"Email filter holds {bloom.count} emails, above its capacity of {self.capacity}; "
+                f"raise EMAIL_FILTER_CAPACITY to keep the false positive rate at {self.error_rate}"
+            )
+        self._filter = bloom
+
+    async def _run(self):
+        while True:
+            try:
+                await self.build()
+            except Exception as e:
+                logging.error(f"Error building email filter: {str(e)}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _on_write(self, operation: str, table: str, filter_dict, data):
+        if table != 'users' or not data or not data.get('email'):
+            return
+        email = normalize_email(data['email'])
+        for bloom in (self._filter, self._pending):
+            if bloom is not None:
+                bloom.add(email)
+
+    def stats(self):
+        return {
+            'ready': self._filter is not None,
+            'emails': self._filter.count if self._filter else 0,
+            'capacity': self.capacity,
+            'skipped_lookups': self.skipped_lookups,
+        }
+
+
+def email_filter_from_env(client):
+    """EMAIL_FILTER_ENABLED=false turns the filter off"""
+    if os.environ.get('EMAIL_FILTER_ENABLED', 'true').lower() != 'true':
+        return None
+    return EmailFilter(
+        client,
+        capacity=int(os.environ.get('EMAIL_FILTER_CAPACITY', '1000000')),
+        error_rate=float(os.environ.get('EMAIL_FILTER_ERROR_RATE', '0.01')),
+        refresh_interval=float(os.environ.get('EMAIL_FILTER_REFRESH_INTERVAL', '300')),
+    )
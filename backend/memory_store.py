@@ -0,0 +1,320 @@
+import asyncio
+import operator
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from storage import (
+    DUPLICATE_KEY, SCHEMA, DatabaseError, Storage, check_names, coerce_value, describe, normalize_email,
+    split_filter_key,
+)
+
+_COMPARE = {
+    '=': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+}
+
+# UNIQUE columns from mysql_schema.sql
+UNIQUE = {'users': ('email',), 'password_reset_tokens': ('token',)}
+# Columns with a hash index, so equality lookups on them skip the table scan
+INDEXED = {
+    'users': ('email',),
+    'password_reset_tokens': ('token', 'user_id'),
+    'chat_messages': ('session_id', 'user_id'),
+    'workouts': ('user_id',),
+}
+# Indexed columns compared case- and accent-insensitively, like their _ci collation in MySQL
+FOLDED = {'users': {'email': normalize_email}}
+# Column defaults from mysql_schema.sql; None means CURRENT_TIMESTAMP
+DEFAULTS = {
+    'users': {'created_at': None},
+    'status_checks': {'timestamp': None},
+    'password_reset_tokens': {'used': False, 'created_at': None},
+    'chat_messages': {'timestamp': None},
+    'workouts': {'created_by_ai': False, 'created_at': None},
+}
+
+
+def _row(data: Dict[str, Any], table: str) -> Dict[str, Any]:
+    row = {}
+    for column, default in DEFAULTS.get(table, {}).items():
+        row[column] = datetime.utcnow() if default is None else default
+    row.update({k: coerce_value(k, v) for k, v in data.items()})
+    return row
+
+
+def _index_key(table: str, column: str, value: Any) -> Any:
+    fold = FOLDED.get(table, {}).get(column)
+    return fold(value) if fold is not None and isinstance(value, str) else value
+
+
+def _matches(row: Dict[str, Any], conditions: List[Tuple[str, Any, Any]]) -> bool:
+    for column, compare, value in conditions:
+        current = row.get(column)
+        if current is None or value is None:
+            # NULL never matches a comparison, as in SQL
+            return False
+        if not compare(current, value):
+            return False
+    return True
+
+
+def _project(row: Dict[str, Any], columns) -> Dict[str, Any]:
+    return {c: row[c] for c in columns if c in row} if columns else dict(row)
+
+
+class MemoryStorage(Storage):
+    """Storage kept in process memory, for tests and benchmarks
+
+    One dict per table keyed by id. UNIQUE columns are enforced as in the
+    MySQL schema, defaults are filled in, and timestamp columns are kept as
+    datetimes so range filters and ordering behave like the real stores.
+    Rows are copied in and out, so callers never share state with the
+    store. Nothing survives a restart.
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        super().__init__()
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {table: {} for table in SCHEMA}
+        # table -> column -> value -> ids
+        self._indexes: Dict[str, Dict[str, Dict[Any, Set[str]]]] = {
+            table: {column: {} for column in columns} for table, columns in INDEXED.items()
+        }
+
+    def _index_add(self, table: str, row: Dict[str, Any]):
+        for column, index in self._indexes.get(table, {}).items():
+            index.setdefault(_index_key(table, column, row.get(column)), set()).add(row['id'])
+
+    def _index_remove(self, table: str, row: Dict[str, Any]):
+        for column, index in self._indexes.get(table, {}).items():
+            key = _index_key(table, column, row.get(column))
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(row['id'])
+                if not ids:
+                    del index[key]
+
+    def _check_unique(self, table: str, row: Dict[str, Any]):
+        for column in UNIQUE.get(table, ()):
+            ids = self._indexes[table][column].get(_index_key(table, column, row.get(column)), ())
+            if any(other != row['id'] for other in ids):
+                raise DatabaseError(
+                    f"Database error: Duplicate entry '{row.get(column)}' for key '{table}.{column}'",
+                    DUPLICATE_KEY,
+                )
+
+    def _select(self, table: str, filter_dict: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rows matching the filter, using the id or a hash index when one applies"""
+        check_names(table, tuple((filter_dict or {}).keys()))
+        rows = self.tables[table]
+        conditions = []
+        candidates = None
+        for key, value in (filter_dict or {}).items():
+            column, op = split_filter_key(key)
+            value = coerce_value(column, value)
+            if candidates is None and op == '=':
+                if column == 'id':
+                    candidates = [value] if value in rows else []
+                    continue
+                index = self._indexes.get(table, {}).get(column)
+                if index is not None:
+                    candidates = list(index.get(_index_key(table, column, value), ()))
+                    continue
+            conditions.append((column, _COMPARE[op], value))
+        source = rows.values() if candidates is None else (rows[i] for i in candidates)
+        return [row for row in source if _matches(row, conditions)]
+
+    def _sorted(self, rows: List[Dict[str, Any]], order_by: str, descending: bool) -> List[Dict[str, Any]]:
+        return sorted(rows, key=lambda row: (row.get(order_by), row['id']), reverse=descending)
+
+    def _timed(self, description: str, started: float, rows: int, error: Optional[Exception] = None):
+        self._emit(description, None, started, 0.0, rows, error)
+
+    def _insert(self, table: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        if 'id' not in data:
+            data['id'] = str(uuid.uuid4())
+        check_names(table, tuple(data.keys()))
+        if data['id'] in self.tables[table]:
+            raise DatabaseError(f"Database error: Duplicate entry '{data['id']}' for key 'PRIMARY'", DUPLICATE_KEY)
+        row = _row(data, table)
+        self._check_unique(table, row)
+        self.tables[table][row['id']] = row
+        self._index_add(table, row)
+        return row
+
+    def _update(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any],
+                undo: Optional[List] = None) -> int:
+        check_names(table, tuple(update_dict.keys()))
+        matched = self._select(table, filter_dict)[:1]
+        for row in matched:
+            updated = {**row, **{k: coerce_value(k, v) for k, v in update_dict.items()}}
+            self._check_unique(table, updated)
+            if undo is not None:
+                undo.append((table, dict(row)))
+            self._index_remove(table, row)
+            row.update(updated)
+            self._index_add(table, row)
+        return len(matched)
+
+    def _delete(self, table: str, rows: List[Dict[str, Any]]) -> int:
+        for row in rows:
+            self._index_remove(table, row)
+            del self.tables[table][row['id']]
+        return len(rows)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator['MemoryTransaction']:
+        """Apply updates immediately and restore the old rows if the block raises"""
+        tx = MemoryTransaction(self)
+        try:
+            yield tx
+        except BaseException:
+            for table, old in reversed(tx.undo):
+                row = self.tables[table][old['id']]
+                self._index_remove(table, row)
+                row.clear()
+                row.update(old)
+                self._index_add(table, row)
+            raise
+        for operation, table, filter_dict, data in tx.writes:
+            await self._notify_write(operation, table, filter_dict, data)
+
+    async def insert_one(self, table: str, data: Dict[str, Any]) -> str:
+        started = time.monotonic()
+        try:
+            self._insert(table, data)
+        except DatabaseError as e:
+            self._timed(describe('insert_one', table, None), started, 0, e)
+            raise
+        self._timed(describe('insert_one', table, None), started, 1)
+        await self._notify_write('insert', table, None, data)
+        return data['id']
+
+    async def insert_many(self, table: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """Insert all rows or none, like the single MySQL transaction"""
+        if not rows:
+            return []
+        started = time.monotonic()
+        inserted = []
+        try:
+            for data in rows:
+                inserted.append(self._insert(table, data))
+        except DatabaseError as e:
+            self._delete(table, inserted)
+            self._timed(describe('insert_many', table, None), started, 0, e)
+            raise
+        self._timed(describe('insert_many', table, None), started, len(rows))
+        for data in rows:
+            await self._notify_write('insert', table, None, data)
+        return [data['id'] for data in rows]
+
+    async def find_one(self, table: str, filter_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        started = time.monotonic()
+        rows = self._select(table, filter_dict)
+        self._timed(describe('find_one', table, filter_dict), started, min(len(rows), 1))
+        return dict(rows[0]) if rows else None
+
+    async def find_all(self, table: str, filter_dict: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        started = time.monotonic()
+        rows = self._select(table, filter_dict)
+        self._timed(describe('find_all', table, filter_dict), started, len(rows))
+        return [dict(row) for row in rows]
+
+    async def find_many(
+        self,
+        table: str,
+        filter_dict: Dict[str, Any] = None,
+        columns: Optional[List[str]] = None,
+        order_by: str = 'id',
+        descending: bool = False,
+        after: Optional[Tuple[Any, Any]] = None,
+        limit: int = 100,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, Any]]]:
+        started = time.monotonic()
+        if columns:
+            columns = tuple(columns) + tuple(c for c in (order_by, 'id') if c not in columns)
+        check_names(table, tuple(columns or ()) + (order_by,))
+        rows = self._sorted(self._select(table, filter_dict), order_by, descending)
+        if after is not None:
+            key = (coerce_value(order_by, after[0]), after[1])
+            if descending:
+                rows = [row for row in rows if (row.get(order_by), row['id']) < key]
+            else:
+                rows = [row for row in rows if (row.get(order_by), row['id']) > key]
+        page = [_project(row, columns) for row in rows[:limit]]
+        self._timed(describe('find_many', table, filter_dict, f" order by {order_by}"), started, len(page))
+        if len(rows) <= limit:
+            return page, None
+        last = page[-1]
+        return page, (last[order_by], last['id'])
+
+    async def stream(
+        self,
+        table: str,
+        filter_dict: Dict[str, Any] = None,
+        columns: Optional[List[str]] = None,
+        order_by: str = 'id',
+        descending: bool = False,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        started = time.monotonic()
+        check_names(table, tuple(columns or ()) + (order_by,))
+        rows = self._sorted(self._select(table, filter_dict), order_by, descending)
+        try:
+            for i in range(0, len(rows), chunk_size):
+                yield [_project(row, columns) for row in rows[i:i + chunk_size]]
+                # Let other requests run between chunks, as a network read would
+                await asyncio.sleep(0)
+        finally:
+            self._timed(describe('stream', table, filter_dict, f" order by {order_by}"), started, len(rows))
+
+    async def update_one(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any]) -> int:
+        started = time.monotonic()
+        matched = self._update(table, filter_dict, update_dict)
+        self._timed(describe('update_one', table, filter_dict), started, matched)
+        await self._notify_write('update', table, filter_dict, update_dict)
+        return matched
+
+    async def delete_one(self, table: str, filter_dict: Dict[str, Any]) -> int:
+        started = time.monotonic()
+        deleted = self._delete(table, self._select(table, filter_dict)[:1])
+        self._timed(describe('delete_one', table, filter_dict), started, deleted)
+        await self._notify_write('delete', table, filter_dict, None)
+        return deleted
+
+    async def delete_many(self, table: str, filter_dict: Dict[str, Any], limit: Optional[int] = None) -> int:
+        started = time.monotonic()
+        rows = self._select(table, filter_dict)
+        deleted = self._delete(table, rows[:limit] if limit is not None else rows)
+        self._timed(describe('delete_many', table, filter_dict), started, deleted)
+        if deleted:
+            await self._notify_write('delete', table, filter_dict, None)
+        return deleted
+
+    async def count(self, table: str, filter_dict: Dict[str, Any] = None) -> int:
+        started = time.monotonic()
+        result = len(self._select(table, filter_dict))
+        self._timed(describe('count', table, filter_dict), started, 1)
+        return result
+
+
+class MemoryTransaction:
+    """Updates issued inside MemoryStorage.transaction()"""
+
+    def __init__(self, client: MemoryStorage):
+        self.client = client
+        # (table, row before the update), replayed backwards on rollback
+        self.undo: List[Tuple[str, Dict[str, Any]]] = []
+        # (operation, table, filter_dict, data) reported to listeners after commit
+        self.writes: List[Tuple[str, str, Optional[Dict[str, Any]], Any]] = []
+
+    async def update_one(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any]) -> int:
+        started = time.monotonic()
+        matched = self.client._update(table, filter_dict, update_dict, self.undo)
+        self.client._timed(describe('update_one', table, filter_dict), started, matched)
+        self.writes.append(('update', table, filter_dict, update_dict))
+        return matched
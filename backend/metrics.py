@@ -0,0 +1,161 @@
+import logging
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets in seconds, from 1ms up to 10s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram with running count and sum"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One slot per bucket plus the +Inf overflow
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'avg': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def histogram_lines(name: str, labels: Dict[str, str], histogram: Histogram) -> List[str]:
+    """Text exposition lines (cumulative buckets, sum, count) for one histogram series"""
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+        cumulative += bucket_count
+        bucket_labels = dict(labels, le=_format_value(bound))
+        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return lines
+
+
+def sample_line(name: str, labels: Dict[str, str], value: float) -> str:
+    return f"{name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """HTTP request metrics plus pluggable collectors, rendered in Prometheus text format"""
+
+    def __init__(self):
+        # (method, route, status) -> count / latency histogram
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[Tuple[str, str, str], Histogram] = {}
+        self.in_progress = 0
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]):
+        """Register a callable returning extra exposition lines (including # TYPE)"""
+        self._collectors.append(collector)
+
+    def observe_request(self, method: str, route: str, status: int, duration: float):
+        key = (method, route, str(status))
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(duration)
+
+    def render(self) -> str:
+        lines = [
+            '# HELP http_requests_total Total HTTP requests by route template and status.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(sample_line('http_requests_total', {'method': method, 'route': route, 'status': status}, count))
+        lines += [
+            '# HELP http_requests_in_progress HTTP requests currently being served.',
+            '# TYPE http_requests_in_progress gauge',
+            sample_line('http_requests_in_progress', {}, self.in_progress),
+            '# HELP http_request_duration_seconds HTTP request latency by route template and status.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (method, route, status), histogram in sorted(self.latency.items()):
+            lines += histogram_lines(
+                'http_request_duration_seconds', {'method': method, 'route': route, 'status': status}, histogram
+            )
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logging.error(f"Metrics collector {collector!r} failed: {e}")
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, in-flight gauge and latency per route template
+
+    The template (e.g. /api/chat/{session_id}) is read from the route the
+    router stored in the scope, so raw paths never become label values.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        self.registry.in_progress += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.registry.in_progress -= 1
+            route = scope.get('route')
+            template = getattr(route, 'path', None) or 'unmatched'
+            self.registry.observe_request(scope['method'], template, status, time.perf_counter() - started)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for the MySQL backend
+Applies backend/migrations/NNNN_name.sql files in order and records each
+version in schema_migrations. The backend runs this at startup unless
+MIGRATE_ON_STARTUP=false. With STORAGE_BACKEND=mongo it creates the
+MongoDB indexes instead.
+
+Usage: python backend/migrate.py [status]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Imported after load_dotenv so the data layer sees the MYSQL_*/MONGO_* settings
+from storage import DatabaseError, storage_from_env
+
+MIGRATIONS_DIR = ROOT_DIR / 'migrations'
+
+CREATE_VERSION_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS schema_migrations ("
+    "version INT PRIMARY KEY, "
+    "name VARCHAR(255) NOT NULL, "
+    "checksum CHAR(64) NOT NULL, "
+    "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+)
+LOCK_NAME = 'schema_migrations'
+
+# Duplicate key name / can't drop key: the index was already created or
+# removed by hand (databases set up with mysql_schema.sql)
+IGNORED_ERRNOS = {1061, 1091}
+# Lock wait timeout: another session holds a metadata lock on the table
+LOCK_WAIT_ERRNO = 1205
+
+
+class Migration:
+    """One migrations/NNNN_name.sql file"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        version, _, name = path.stem.partition('_')
+        self.version = int(version)
+        self.name = name
+        sql = path.read_text()
+        self.checksum = hashlib.sha256(sql.encode()).hexdigest()
+        self.statements = split_statements(sql)
+
+
+def split_statements(sql: str) -> List[str]:
+    """Split a migration file on ';', dropping `--` comment lines"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = sorted((Migration(path) for path in directory.glob('[0-9]*_*.sql')), key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise Exception(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+class MigrationRunner:
+    """Applies pending migrations on one connection
+
+    A named lock keeps workers that start together from migrating twice.
+    DDL runs with a short lock_wait_timeout so an ALTER waiting behind a
+    long transaction gives up (and is retried) instead of queueing every
+    other query on that table behind its metadata lock. Index changes use
+    ALGORITHM=INPLACE, LOCK=NONE so they fail rather than block writes.
+    """
+
+    def __init__(self, client, directory: Path = MIGRATIONS_DIR, lock_timeout: int = 60,
+                 lock_wait_timeout: int = 5, retries: int = 5):
+        self.client = client
+        self.directory = directory
+        self.lock_timeout = lock_timeout
+        self.lock_wait_timeout = lock_wait_timeout
+        self.retries = retries
+
+    async def _execute(self, connection, query: str, params: tuple = None, fetch_one: bool = False,
+                       fetch_all: bool = False):
+        return await self.client._run(connection, query, params, fetch_one, fetch_all, time.monotonic())
+
+    async def _applied(self, connection) -> Dict[int, str]:
+        await self._execute(connection, CREATE_VERSION_TABLE_SQL)
+        rows = await self._execute(connection, "SELECT version, checksum FROM schema_migrations", fetch_all=True)
+        return {row['version']: row['checksum'] for row in rows}
+
+    async def status(self) -> List[Tuple[Migration, bool]]:
+        """Every known migration and whether it has been applied"""
+        async with self.client.get_connection() as connection:
+            applied = await self._applied(connection)
+        return [(migration, migration.version in applied) for migration in load_migrations(self.directory)]
+
+    async def _apply_statement(self, connection, statement: str):
+        for attempt in range(self.retries):
+            try:
+                await self._execute(connection, statement)
+                return
+            except DatabaseError as e:
+                if e.errno in IGNORED_ERRNOS:
+                    logging.info(f"Skipping migration statement already applied: {e}")
+                    return
+                if e.errno != LOCK_WAIT_ERRNO or attempt == self.retries - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def migrate(self) -> List[Migration]:
+        """Apply pending migrations in version order; returns the ones applied"""
+        migrations = load_migrations(self.directory)
+        done = []
+        async with self.client.get_connection() as connection:
+            locked = await self._execute(
+                connection, "SELECT GET_LOCK(%s, %s) AS locked", (LOCK_NAME, self.lock_timeout), fetch_one=True,
+            )
+            if not locked or locked['locked'] != 1:
+                raise Exception(f"Could not take the {LOCK_NAME} lock within {self.lock_timeout}s")
+            previous = await self._execute(
+                connection, "SELECT @@SESSION.lock_wait_timeout AS value", fetch_one=True,
+            )
+            try:
+                await self._execute(connection, "SET SESSION lock_wait_timeout = %s", (self.lock_wait_timeout,))
+                applied = await self._applied(connection)
+                for migration in migrations:
+                    if migration.version in applied:
+                        if applied[migration.version] != migration.checksum:
+                            logging.warning(
+                                f"Migration {migration.path.name} changed after it was applied; "
+                                f"add a new migration instead of editing it"
+                            )
+                        continue
+                    logging.info(f"Applying migration {migration.path.name}")
+                    for statement in migration.statements:
+                        await self._apply_statement(connection, statement)
+                    await self._execute(
+                        connection,
+                        "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                        (migration.version, migration.name, migration.checksum),
+                    )
+                    await connection.commit()
+                    done.append(migration)
+            finally:
+                await self._execute(connection, "SET SESSION lock_wait_timeout = %s", (previous['value'],))
+                await self._execute(connection, "SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        return done
+
+
+async def main(command: str):
+    db = storage_from_env()
+    try:
+        if command == 'status':
+            if db.name != 'mysql':
+                raise SystemExit(f"status is only tracked for MySQL (STORAGE_BACKEND={db.name})")
+            for migration, applied in await MigrationRunner(db).status():
+                print(f"{'applied' if applied else 'pending'}  {migration.path.name}")
+        else:
+            # MySQL applies the migrations files, MongoDB creates its indexes
+            done = await db.migrate()
+            for item in done:
+                print(f"Applied {item.path.name if isinstance(item, Migration) else item}")
+            if not done:
+                print("Schema is up to date")
+    finally:
+        await db.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Apply or list schema migrations")
+    parser.add_argument('command', nargs='?', choices=['migrate', 'status'], default='migrate')
+    asyncio.run(main(parser.parse_args().command))
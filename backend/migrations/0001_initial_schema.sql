@@ -0,0 +1,54 @@
+-- Tables and indexes from the original hand-run mysql_schema.sql.
+-- Safe on databases where that script was already applied.
+
+CREATE TABLE IF NOT EXISTS users (
+    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+    name VARCHAR(255) NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS status_checks (
+    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+    client_name VARCHAR(255) NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS password_reset_tokens (
+    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+    user_id CHAR(36) NOT NULL,
+    token VARCHAR(255) UNIQUE NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    used BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+    session_id VARCHAR(255) NOT NULL,
+    user_id CHAR(36) NOT NULL,
+    message TEXT NOT NULL,
+    response TEXT NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS workouts (
+    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+    user_id CHAR(36) NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    category VARCHAR(255) NOT NULL,
+    exercises JSON NOT NULL,
+    duration VARCHAR(255) NOT NULL,
+    difficulty VARCHAR(255) NOT NULL,
+    created_by_ai BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+ALTER TABLE password_reset_tokens ADD INDEX idx_password_reset_tokens_user_id (user_id), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE chat_messages ADD INDEX idx_chat_messages_session_id (session_id), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE chat_messages ADD INDEX idx_chat_messages_user_id (user_id), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE workouts ADD INDEX idx_workouts_user_id (user_id), ALGORITHM=INPLACE, LOCK=NONE;
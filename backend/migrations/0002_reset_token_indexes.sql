@@ -0,0 +1,5 @@
+-- Valid-token lookup and the purge job (see reset_tokens.py)
+
+ALTER TABLE password_reset_tokens ADD INDEX idx_password_reset_tokens_lookup (token, used, expires_at), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE password_reset_tokens ADD INDEX idx_password_reset_tokens_expires_at (expires_at), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE password_reset_tokens ADD INDEX idx_password_reset_tokens_used (used), ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,14 @@
+-- Composite indexes for the keyset-paginated history queries, so
+-- ORDER BY <column>, id is read in index order instead of a filesort.
+-- InnoDB appends the primary key (id) to every secondary index.
+--   GET /api/chat/{session_id} and the chat context: session_id, ORDER BY timestamp
+--   GET /api/workouts/{user_id}: user_id, ORDER BY created_at DESC
+--   GET /api/status: ORDER BY timestamp
+
+ALTER TABLE chat_messages ADD INDEX idx_chat_messages_session_timestamp (session_id, timestamp), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE workouts ADD INDEX idx_workouts_user_created_at (user_id, created_at), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE status_checks ADD INDEX idx_status_checks_timestamp (timestamp), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- The single-column indexes are now prefixes of the composite ones
+ALTER TABLE chat_messages DROP INDEX idx_chat_messages_session_id, ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE workouts DROP INDEX idx_workouts_user_id, ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,390 @@
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+from pymongo.collation import Collation
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from storage import (
+    DUPLICATE_KEY, DatabaseError, Storage, check_names, coerce_value, describe, split_filter_key,
+)
+
+_OPERATORS = {'=': '$eq', '!=': '$ne', '<': '$lt', '<=': '$lte', '>': '$gt', '>=': '$gte'}
+
+# Columns compared case-insensitively, like their _ci collation in MySQL.
+# Queries on them pass the same collation so the index applies.
+COLLATIONS = {'users': {'email': Collation(locale='en', strength=2)}}
+
+# Same access paths as the MySQL migrations
+INDEXES = {
+    'users': [([('email', ASCENDING)], {'unique': True, 'name': 'email_ci',
+                                        'collation': COLLATIONS['users']['email']})],
+    'password_reset_tokens': [
+        ([('token', ASCENDING)], {'unique': True}),
+        ([('expires_at', ASCENDING)], {}),
+        ([('used', ASCENDING)], {}),
+    ],
+    'chat_messages': [([('session_id', ASCENDING), ('timestamp', ASCENDING), ('_id', ASCENDING)], {})],
+    'workouts': [([('user_id', ASCENDING), ('created_at', ASCENDING), ('_id', ASCENDING)], {})],
+    'status_checks': [([('timestamp', ASCENDING), ('_id', ASCENDING)], {})],
+}
+
+# Indexes replaced by the ones above, dropped by migrate()
+DROPPED_INDEXES = {'users': ['email_1']}
+
+
+def _field(column: str) -> str:
+    return '_id' if column == 'id' else column
+
+
+def _document(data: Dict[str, Any]) -> Dict[str, Any]:
+    # Timestamps are stored as BSON dates so range filters and sorting compare dates
+    return {_field(k): coerce_value(k, v) for k, v in data.items()}
+
+
+def _row(document: Dict[str, Any]) -> Dict[str, Any]:
+    row = dict(document)
+    if '_id' in row:
+        row['id'] = row.pop('_id')
+    return row
+
+
+def _query(filter_dict: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    query: Dict[str, Dict[str, Any]] = {}
+    for key, value in (filter_dict or {}).items():
+        column, op = split_filter_key(key)
+        query.setdefault(_field(column), {})[_OPERATORS[op]] = coerce_value(column, value)
+    return query
+
+
+def _collation(table: str, filter_dict: Optional[Dict[str, Any]]) -> Optional[Collation]:
+    columns = COLLATIONS.get(table, {})
+    for key in filter_dict or {}:
+        collation = columns.get(split_filter_key(key)[0])
+        if collation is not None:
+            return collation
+    return None
+
+
+def _projection(columns) -> Optional[Dict[str, int]]:
+    if not columns:
+        return None
+    return {_field(c): 1 for c in columns}
+
+
+class MongoDBClient(Storage):
+    """Storage on MongoDB through Motor
+
+    Each table is a collection and `id` is stored as `_id`. Timestamp
+    columns are stored as dates. Multi-document transactions need a
+    replica set, so transaction() only opens one when MONGO_TRANSACTIONS
+    is true; otherwise its writes run one by one, and insert_many removes
+    the rows it did insert when the batch fails partway.
+    """
+
+    name = 'mongo'
+
+    def __init__(self, url: str, database: str, min_pool_size: int = 0, max_pool_size: int = 100,
+                 use_transactions: bool = False):
+        super().__init__()
+        self.url = url
+        self.database_name = database
+        self.min_pool_size = min_pool_size
+        self.max_pool_size = max_pool_size
+        self.use_transactions = use_transactions
+        # Created lazily so the client binds to the running event loop
+        self.client = None
+        self.db = None
+
+    async def connect(self):
+        if self.client is None:
+            self.client = AsyncIOMotorClient(
+                self.url, minPoolSize=self.min_pool_size, maxPoolSize=self.max_pool_size,
+            )
+            self.db = self.client[self.database_name]
+        return self.db
+
+    async def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+            self.db = None
+
+    async def migrate(self) -> List[str]:
+        """Create the indexes the API queries rely on; returns their names"""
+        db = await self.connect()
+        for table, names in DROPPED_INDEXES.items():
+            existing = await db[table].index_information()
+            for name in names:
+                if name in existing:
+                    await db[table].drop_index(name)
+        created = []
+        for table, indexes in INDEXES.items():
+            for keys, options in indexes:
+                created.append(await db[table].create_index(keys, **options))
+        return created
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {'min_size': self.min_pool_size, 'max_size': self.max_pool_size}
+
+    async def _collection(self, table: str, names=()):
+        check_names(table, names)
+        db = await self.connect()
+        return db[table]
+
+    async def _call(self, description: str, operation, rows=lambda result: 0):
+        """Await `operation`, reporting it to the query hooks as `description`"""
+        started = time.monotonic()
+        count, error = 0, None
+        try:
+            result = await operation
+            count = rows(result)
+            return result
+        except DuplicateKeyError as e:
+            error = e
+            raise DatabaseError(f"Database error: {e}", DUPLICATE_KEY)
+        except BulkWriteError as e:
+            error = e
+            codes = {w.get('code') for w in e.details.get('writeErrors', [])}
+            raise DatabaseError(f"Database error: {e}", DUPLICATE_KEY if 11000 in codes else None) from e
+        except PyMongoError as e:
+            error = e
+            raise DatabaseError(f"Database error: {e}")
+        finally:
+            self._emit(description, None, started, 0.0, count, error)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator['MongoTransaction']:
+        """Run several writes as a unit (atomic only when use_transactions is set)"""
+        await self.connect()
+        tx = MongoTransaction(self)
+        if self.use_transactions:
+            async with await self.client.start_session() as session:
+                async with session.start_transaction():
+                    tx.session = session
+                    yield tx
+        else:
+            yield tx
+        for operation, table, filter_dict, data in tx.writes:
+            await self._notify_write(operation, table, filter_dict, data)
+
+    async def insert_one(self, table: str, data: Dict[str, Any]) -> str:
+        if 'id' not in data:
+            data['id'] = str(uuid.uuid4())
+        collection = await self._collection(table, tuple(data.keys()))
+        await self._call(describe('insert_one', table, None), collection.insert_one(_document(data)), lambda r: 1)
+        await self._notify_write('insert', table, None, data)
+        return data['id']
+
+    async def insert_many(self, table: str, rows: List[Dict[str, Any]]) -> List[str]:
+        if not rows:
+            return []
+        for row in rows:
+            if 'id' not in row:
+                row['id'] = str(uuid.uuid4())
+        collection = await self._collection(table, tuple(rows[0].keys()))
+        documents = [_document(row) for row in rows]
+        description = describe('insert_many', table, None)
+        if self.use_transactions:
+            async with await self.client.start_session() as session:
+                async with session.start_transaction():
+                    await self._call(description, collection.insert_many(documents, ordered=True, session=session),
+                                     lambda r: len(r.inserted_ids))
+        else:
+            try:
+                await self._call(description, collection.insert_many(documents, ordered=True),
+                                 lambda r: len(r.inserted_ids))
+            except DatabaseError as e:
+                # An ordered insert stops at the first failure; remove the rows before it so
+                # the batch is all or nothing, as in one MySQL transaction
+                inserted = e.__cause__.details.get('nInserted', 0) if isinstance(e.__cause__, BulkWriteError) else 0
+                if inserted:
+                    await self._call(
+                        describe('delete_many', table, None),
+                        collection.delete_many({'_id': {'$in': [row['id'] for row in rows[:inserted]]}}),
+                        lambda r: r.deleted_count,
+                    )
+                raise
+        for row in rows:
+            await self._notify_write('insert', table, None, row)
+        return [row['id'] for row in rows]
+
+    async def find_one(self, table: str, filter_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        collection = await self._collection(table, tuple(filter_dict.keys()))
+        document = await self._call(
+            describe('find_one', table, filter_dict),
+            collection.find_one(_query(filter_dict), collation=_collation(table, filter_dict)),
+            lambda r: 1 if r else 0,
+        )
+        return _row(document) if document else None
+
+    async def find_all(self, table: str, filter_dict: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        keys = tuple((filter_dict or {}).keys())
+        collection = await self._collection(table, keys)
+        documents = await self._call(
+            describe('find_all', table, filter_dict),
+            collection.find(_query(filter_dict), collation=_collation(table, filter_dict)).to_list(length=None),
+            len,
+        )
+        return [_row(d) for d in documents]
+
+    def _sort(self, order_by: str, descending: bool) -> List[Tuple[str, int]]:
+        direction = DESCENDING if descending else ASCENDING
+        return [(_field(order_by), direction), ('_id', direction)] if order_by != 'id' else [('_id', direction)]
+
+    async def find_many(
+        self,
+        table: str,
+        filter_dict: Dict[str, Any] = None,
+        columns: Optional[List[str]] = None,
+        order_by: str = 'id',
+        descending: bool = False,
+        after: Optional[Tuple[Any, Any]] = None,
+        limit: int = 100,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, Any]]]:
+        keys = tuple((filter_dict or {}).keys())
+        if columns:
+            columns = tuple(columns) + tuple(c for c in (order_by, 'id') if c not in columns)
+        collection = await self._collection(table, keys + tuple(columns or ()) + (order_by,))
+
+        query = _query(filter_dict)
+        if after is not None:
+            op = '$lt' if descending else '$gt'
+            field, value = _field(order_by), coerce_value(order_by, after[0])
+            query = {'$and': [query, {'$or': [
+                {field: {op: value}},
+                {field: value, '_id': {op: after[1]}},
+            ]}]}
+        cursor = collection.find(query, _projection(columns), collation=_collation(table, filter_dict))
+        cursor = cursor.sort(self._sort(order_by, descending)).limit(limit + 1)
+        documents = await self._call(
+            describe('find_many', table, filter_dict, f" order by {order_by}{' desc' if descending else ''}"),
+            cursor.to_list(length=limit + 1),
+            len,
+        )
+
+        result = [_row(d) for d in documents]
+        if len(result) <= limit:
+            return result, None
+        rows = result[:limit]
+        last = rows[-1]
+        return rows, (last[order_by], last['id'])
+
+    async def stream(
+        self,
+        table: str,
+        filter_dict: Dict[str, Any] = None,
+        columns: Optional[List[str]] = None,
+        order_by: str = 'id',
+        descending: bool = False,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        keys = tuple((filter_dict or {}).keys())
+        collection = await self._collection(table, keys + tuple(columns or ()) + (order_by,))
+        cursor = collection.find(_query(filter_dict), _projection(columns), batch_size=chunk_size,
+                                 collation=_collation(table, filter_dict))
+        cursor = cursor.sort(self._sort(order_by, descending))
+
+        started = time.monotonic()
+        total, error, chunk = 0, None, []
+        try:
+            async for document in cursor:
+                chunk.append(_row(document))
+                if len(chunk) >= chunk_size:
+                    total += len(chunk)
+                    yield chunk
+                    chunk = []
+            if chunk:
+                total += len(chunk)
+                yield chunk
+        except PyMongoError as e:
+            error = e
+            raise Exception(f"Error streaming from {table}: {e}")
+        finally:
+            await cursor.close()
+            self._emit(describe('stream', table, filter_dict, f' order by {order_by}'), None, started, 0.0, total, error)
+
+    async def _update(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any],
+                      session=None) -> int:
+        collection = await self._collection(table, tuple(filter_dict.keys()) + tuple(update_dict.keys()))
+        result = await self._call(
+            describe('update_one', table, filter_dict),
+            collection.update_one(_query(filter_dict), {'$set': _document(update_dict)}, session=session,
+                                  collation=_collation(table, filter_dict)),
+            lambda r: r.matched_count,
+        )
+        return result.matched_count
+
+    async def update_one(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any]) -> int:
+        matched = await self._update(table, filter_dict, update_dict)
+        await self._notify_write('update', table, filter_dict, update_dict)
+        return matched
+
+    async def delete_one(self, table: str, filter_dict: Dict[str, Any]) -> int:
+        collection = await self._collection(table, tuple(filter_dict.keys()))
+        result = await self._call(
+            describe('delete_one', table, filter_dict),
+            collection.delete_one(_query(filter_dict), collation=_collation(table, filter_dict)),
+            lambda r: r.deleted_count,
+        )
+        await self._notify_write('delete', table, filter_dict, None)
+        return result.deleted_count
+
+    async def delete_many(self, table: str, filter_dict: Dict[str, Any], limit: Optional[int] = None) -> int:
+        keys = tuple(filter_dict.keys())
+        collection = await self._collection(table, keys)
+        query = _query(filter_dict)
+        if limit is not None:
+            # delete_many has no limit; pick the batch first
+            cursor = collection.find(query, {'_id': 1}, collation=_collation(table, filter_dict)).limit(limit)
+            documents = await self._call(describe('find_ids', table, filter_dict), cursor.to_list(length=limit), len)
+            if not documents:
+                return 0
+            query = {'_id': {'$in': [d['_id'] for d in documents]}}
+        result = await self._call(
+            describe('delete_many', table, filter_dict),
+            collection.delete_many(query, collation=_collation(table, filter_dict)),
+            lambda r: r.deleted_count,
+        )
+        if result.deleted_count:
+            await self._notify_write('delete', table, filter_dict, None)
+        return result.deleted_count
+
+    async def count(self, table: str, filter_dict: Dict[str, Any] = None) -> int:
+        keys = tuple((filter_dict or {}).keys())
+        collection = await self._collection(table, keys)
+        return await self._call(
+            describe('count', table, filter_dict),
+            collection.count_documents(_query(filter_dict), collation=_collation(table, filter_dict)),
+            lambda r: 1,
+        )
+
+
+class MongoTransaction:
+    """Writes issued inside MongoDBClient.transaction()"""
+
+    def __init__(self, client: MongoDBClient):
+        self.client = client
+        self.session = None
+        # (operation, table, filter_dict, data) reported to listeners at the end
+        self.writes: List[Tuple[str, str, Optional[Dict[str, Any]], Any]] = []
+
+    async def update_one(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any]) -> int:
+        result = await self.client._update(table, filter_dict, update_dict, session=self.session)
+        self.writes.append(('update', table, filter_dict, update_dict))
+        return result
+
+
+def mongo_client_from_env() -> MongoDBClient:
+    """MONGO_URL and DB_NAME as in the Mongo server; MONGO_TRANSACTIONS=true needs a replica set"""
+    return MongoDBClient(
+        os.environ.get('MONGO_URL', 'mongodb://localhost:27017'),
+        os.environ.get('DB_NAME', 'fitness_app'),
+        min_pool_size=int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+        max_pool_size=int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+        use_transactions=os.environ.get('MONGO_TRANSACTIONS', 'false').lower() == 'true',
+    )
@@ -1,154 +1,571 @@
-import mysql.connector
-from mysql.connector import Error, pooling
+import aiomysql
+from pymysql import Error
+import asyncio
+import logging
 import os
 import json
-from typing import Dict, List, Optional, Any
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any, Tuple
 import uuid
 from datetime import datetime
 
+from storage import DatabaseError, Storage, check_names, split_filter_key
+
+
+def _conditions(keys: Tuple[str, ...]) -> List[str]:
+    return [f"{column} {op} %s" for column, op in map(split_filter_key, keys)]
+
+
+def _where(keys: Tuple[str, ...]) -> str:
+    return ' AND '.join(_conditions(keys))
+
+
+def _packet_chunks(connection, prefix_size: int, rows: List[tuple], max_size: int) -> List[List[tuple]]:
+    """Group rows so each multi-row INSERT stays under `max_size` bytes
+
+    Values are measured as the connection will send them, escaped and
+    encoded, so quotes and backslashes in JSON or text columns count.
+    """
+    chunks, chunk, chunk_size = [], [], prefix_size
+    for values in rows:
+        # "(v1, v2), " around the escaped values
+        row_size = sum(len(connection.escape(v).encode(connection.encoding)) + 2 for v in values) + 2
+        if chunk and chunk_size + row_size > max_size:
+            chunks.append(chunk)
+            chunk, chunk_size = [], prefix_size
+        chunk.append(values)
+        chunk_size += row_size
+    chunks.append(chunk)
+    return chunks
+
+
+class PoolStats:
+    """Counters describing how the connection pool is being used"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_timeouts = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.health_check_failures = 0
+        self.recycled = 0
+        self.session_resets = 0
+
+    def record_checkout(self, wait_time: float):
+        self.checkouts += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'checkouts': self.checkouts,
+            'checkout_failures': self.checkout_failures,
+            'checkout_timeouts': self.checkout_timeouts,
+            'avg_wait_time': self.total_wait_time / self.checkouts if self.checkouts else 0.0,
+            'max_wait_time': self.max_wait_time,
+            'total_wait_time': self.total_wait_time,
+            'health_check_failures': self.health_check_failures,
+            'recycled': self.recycled,
+            'session_resets': self.session_resets,
+        }
+
+
+class MySQLClient(Storage):
+    name = 'mysql'
 
-class MySQLClient:
     def __init__(self):
-        self.connection_pool = self._create_connection_pool()
-    
-    def _create_connection_pool(self):
+        super().__init__()
+        # The pool is created lazily because aiomysql needs a running event loop
+        self.connection_pool = None
+        self._pool_lock = asyncio.Lock()
+        self.min_size = int(os.environ.get('MYSQL_POOL_MIN_SIZE', '1'))
+        self.max_size = int(os.environ.get('MYSQL_POOL_MAX_SIZE', '10'))
+        # Seconds to wait for a free connection before giving up
+        self.checkout_timeout = float(os.environ.get('MYSQL_POOL_TIMEOUT', '10'))
+        # Connections older than this are closed instead of going back to the pool
+        self.max_lifetime = float(os.environ.get('MYSQL_POOL_MAX_LIFETIME', '3600'))
+        # Connections idle for longer than this are pinged before being handed out
+        self.health_check_interval = float(os.environ.get('MYSQL_POOL_HEALTH_CHECK_INTERVAL', '30'))
+        # When false the session is only reset if a connection comes back mid-transaction
+        self.reset_session = os.environ.get('MYSQL_POOL_RESET_SESSION', 'false').lower() == 'true'
+        self.stats = PoolStats()
+        # Upper bound for one multi-row INSERT; keep below the server's max_allowed_packet
+        self.max_packet_size = int(os.environ.get('MYSQL_MAX_PACKET_SIZE', str(4 * 1024 * 1024)))
+        # Generated SQL per query shape, see _sql()
+        self._sql_cache: Dict[Tuple, str] = {}
+
+    async def _create_connection_pool(self):
         """Create a connection pool for MySQL"""
         try:
             config = {
                 'host': os.environ.get('MYSQL_HOST', 'localhost'),
-                'database': os.environ.get('MYSQL_DATABASE', 'fitness_app'),
+                'db': os.environ.get('MYSQL_DATABASE', 'fitness_app'),
                 'user': os.environ.get('MYSQL_USER', 'fitness_user'),
                 'password': os.environ.get('MYSQL_PASSWORD', 'fitness_password'),
                 'port': int(os.environ.get('MYSQL_PORT', '3306')),
-                'pool_name': 'fitness_pool',
-                'pool_size': 5,
-                'pool_reset_session': True,
+                'minsize': self.min_size,
+                'maxsize': self.max_size,
+                'pool_recycle': int(self.max_lifetime),
                 'autocommit': True
             }
-            
-            return pooling.MySQLConnectionPool(**config)
+
+            return await aiomysql.create_pool(**config)
         except Error as e:
             raise Exception(f"Error creating MySQL connection pool: {e}")
-    
-    def get_connection(self):
-        """Get a connection from the pool"""
+
+    async def migrate(self) -> List[Any]:
+        """Apply pending migrations from backend/migrations"""
+        from migrate import MigrationRunner
+        return await MigrationRunner(self).migrate()
+
+    async def connect(self):
+        """Create the connection pool if it does not exist yet"""
+        if self.connection_pool is None:
+            async with self._pool_lock:
+                if self.connection_pool is None:
+                    self.connection_pool = await self._create_connection_pool()
+        return self.connection_pool
+
+    async def close(self):
+        """Close the connection pool and wait for connections to be released"""
+        if self.connection_pool is not None:
+            self.connection_pool.close()
+            await self.connection_pool.wait_closed()
+            self.connection_pool = None
+
+    async def _checkout(self, pool):
+        """Acquire a connection, waiting at most checkout_timeout seconds"""
+        started = time.monotonic()
         try:
-            return self.connection_pool.get_connection()
+            connection = await asyncio.wait_for(pool.acquire(), timeout=self.checkout_timeout)
+        except asyncio.TimeoutError:
+            self.stats.checkout_failures += 1
+            self.stats.checkout_timeouts += 1
+            raise Exception(
+                f"Error getting connection from pool: timed out after {self.checkout_timeout}s"
+            )
         except Error as e:
+            self.stats.checkout_failures += 1
             raise Exception(f"Error getting connection from pool: {e}")
-    
-    def execute_query(self, query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False):
-        """Execute a query with optional parameters"""
-        connection = None
-        cursor = None
+        self.stats.record_checkout(time.monotonic() - started)
+
+        now = time.monotonic()
+        if not hasattr(connection, '_pool_created_at'):
+            connection._pool_created_at = now
+        elif now - getattr(connection, '_pool_released_at', now) > self.health_check_interval:
+            try:
+                await connection.ping(reconnect=False)
+            except Exception:
+                # Drop the dead connection and try once more with a fresh one
+                self.stats.health_check_failures += 1
+                connection.close()
+                pool.release(connection)
+                return await self._checkout(pool)
+        return connection
+
+    async def _checkin(self, pool, connection):
+        """Reset (if needed) and return a connection, recycling it when too old"""
+        if not connection.closed:
+            if self.reset_session or connection.get_transaction_status():
+                self.stats.session_resets += 1
+                try:
+                    await connection.rollback()
+                except Error:
+                    connection.close()
+            now = time.monotonic()
+            if now - connection._pool_created_at > self.max_lifetime:
+                self.stats.recycled += 1
+                connection.close()
+            connection._pool_released_at = now
+        pool.release(connection)
+
+    @asynccontextmanager
+    async def get_connection(self):
+        """Get a connection from the pool"""
+        pool = await self.connect()
+        connection = await self._checkout(pool)
+        try:
+            yield connection
+        finally:
+            await self._checkin(pool, connection)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Live pool usage, suitable for scraping"""
+        pool = self.connection_pool
+        size = pool.size if pool is not None else 0
+        idle = pool.freesize if pool is not None else 0
+        return {
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+            'size': size,
+            'in_use': size - idle,
+            'idle': idle,
+            **self.stats.to_dict(),
+        }
+
+    async def _run(self, connection, query: str, params: Optional[tuple], fetch_one: bool, fetch_all: bool,
+                   started: float, pool_wait: float = 0.0):
+        """Run one statement on `connection` and report it to the query hooks"""
+        rows, error = 0, None
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            if fetch_one:
-                return cursor.fetchone()
-            elif fetch_all:
-                return cursor.fetchall()
-            else:
-                return cursor.rowcount
-                
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                if params:
+                    await cursor.execute(query, params)
+                else:
+                    await cursor.execute(query)
+
+                if fetch_one:
+                    result = await cursor.fetchone()
+                    rows = 1 if result else 0
+                elif fetch_all:
+                    result = await cursor.fetchall()
+                    rows = len(result)
+                else:
+                    result = rows = cursor.rowcount
+                return result
+
         except Error as e:
-            if connection:
-                connection.rollback()
-            raise Exception(f"Database error: {e}")
+            error = e
+            errno = e.args[0] if e.args and isinstance(e.args[0], int) else None
+            raise DatabaseError(f"Database error: {e}", errno)
         finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-    
-    def insert_one(self, table: str, data: Dict[str, Any]) -> str:
+            self._emit(query, params, started, pool_wait, rows, error)
+
+    async def execute_query(self, query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False):
+        """Execute a query with optional parameters"""
+        started = time.monotonic()
+        async with self.get_connection() as connection:
+            pool_wait = time.monotonic() - started
+            try:
+                return await self._run(connection, query, params, fetch_one, fetch_all, started, pool_wait)
+            except DatabaseError:
+                await connection.rollback()
+                raise
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator['Transaction']:
+        """Run several statements on one connection, committed together
+
+        Commits when the block exits normally and rolls back if it raises.
+        Write listeners are only told about writes once the commit succeeds.
+        """
+        async with self.get_connection() as connection:
+            await connection.begin()
+            tx = Transaction(self, connection)
+            try:
+                yield tx
+                await connection.commit()
+            except BaseException:
+                try:
+                    await connection.rollback()
+                except Error as e:
+                    logging.error(f"Error rolling back transaction: {e}")
+                raise
+        for operation, table, filter_dict, data in tx.writes:
+            await self._notify_write(operation, table, filter_dict, data)
+
+    def _sql(self, key: Tuple, build: Callable[[], str]) -> str:
+        """Return the SQL for a query shape, building and validating it once
+
+        `key` is (operation, table, *column name tuples). Identifiers are only
+        checked against SCHEMA when the shape is first seen.
+        """
+        query = self._sql_cache.get(key)
+        if query is None:
+            for part in key[2:]:
+                check_names(key[1], part if isinstance(part, tuple) else (part,))
+            query = build()
+            self._sql_cache[key] = query
+        return query
+
+    async def insert_one(self, table: str, data: Dict[str, Any]) -> str:
         """Insert one record and return the ID"""
         # Generate UUID if not provided
         if 'id' not in data:
             data['id'] = str(uuid.uuid4())
-        
-        columns = ', '.join(data.keys())
-        placeholders = ', '.join(['%s'] * len(data))
-        query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
-        
+
+        keys = tuple(data.keys())
+        query = self._sql(
+            ('insert_one', table, keys),
+            lambda: f"INSERT INTO {table} ({', '.join(keys)}) VALUES ({', '.join(['%s'] * len(keys))})",
+        )
+
         try:
-            self.execute_query(query, tuple(data.values()))
-            return data['id']
+            await self.execute_query(query, tuple(data.values()))
         except Exception as e:
-            raise Exception(f"Error inserting into {table}: {e}")
-    
-    def find_one(self, table: str, filter_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            # Keep the errno so callers can tell duplicate keys (1062) apart
+            raise DatabaseError(f"Error inserting into {table}: {e}", getattr(e, 'errno', None))
+        await self._notify_write('insert', table, None, data)
+        return data['id']
+
+    async def insert_many(self, table: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """Insert many records in one transaction and return their IDs
+
+        Rows are sent as multi-row INSERT statements, split so that no
+        statement exceeds max_packet_size. All rows must have the same keys.
+        """
+        if not rows:
+            return []
+
+        for row in rows:
+            if 'id' not in row:
+                row['id'] = str(uuid.uuid4())
+        keys = tuple(rows[0].keys())
+        for row in rows:
+            if set(row.keys()) != set(keys):
+                raise Exception(f"Error inserting into {table}: all rows must have the same columns")
+
+        prefix = self._sql(
+            ('insert_many', table, keys),
+            lambda: f"INSERT INTO {table} ({', '.join(keys)}) VALUES ",
+        )
+        row_placeholder = '(' + ', '.join(['%s'] * len(keys)) + ')'
+
+        started = time.monotonic()
+        async with self.get_connection() as connection:
+            pool_wait = time.monotonic() - started
+            chunks = _packet_chunks(connection, len(prefix.encode()), [tuple(row[k] for k in keys) for row in rows],
+                                    self.max_packet_size)
+            query, error = prefix, None
+            try:
+                await connection.begin()
+                async with connection.cursor() as cursor:
+                    for chunk in chunks:
+                        query = prefix + ', '.join([row_placeholder] * len(chunk))
+                        await cursor.execute(query, tuple(v for values in chunk for v in values))
+                await connection.commit()
+            except Error as e:
+                error = e
+                await connection.rollback()
+                errno = e.args[0] if e.args and isinstance(e.args[0], int) else None
+                raise DatabaseError(f"Error inserting many into {table}: {e}", errno)
+            finally:
+                self._emit(query, None, started, pool_wait, len(rows), error)
+
+        for row in rows:
+            await self._notify_write('insert', table, None, row)
+        return [row['id'] for row in rows]
+
+    async def find_one(self, table: str, filter_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Find one record by filter"""
-        where_clause = ' AND '.join([f"{k} = %s" for k in filter_dict.keys()])
-        query = f"SELECT * FROM {table} WHERE {where_clause}"
-        
+        keys = tuple(filter_dict.keys())
+        query = self._sql(
+            ('find_one', table, keys),
+            lambda: f"SELECT * FROM {table} WHERE {_where(keys)}",
+        )
+
         try:
-            result = self.execute_query(query, tuple(filter_dict.values()), fetch_one=True)
+            result = await self.execute_query(query, tuple(filter_dict.values()), fetch_one=True)
             return result
         except Exception as e:
             raise Exception(f"Error finding in {table}: {e}")
-    
-    def find_all(self, table: str, filter_dict: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+
+    async def find_all(self, table: str, filter_dict: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Find all records matching filter"""
-        if filter_dict:
-            where_clause = ' AND '.join([f"{k} = %s" for k in filter_dict.keys()])
-            query = f"SELECT * FROM {table} WHERE {where_clause}"
-            params = tuple(filter_dict.values())
-        else:
-            query = f"SELECT * FROM {table}"
-            params = None
-        
+        keys = tuple((filter_dict or {}).keys())
+        query = self._sql(
+            ('find_all', table, keys),
+            lambda: f"SELECT * FROM {table}" + (f" WHERE {_where(keys)}" if keys else ""),
+        )
+        params = tuple(filter_dict.values()) if keys else None
+
         try:
-            result = self.execute_query(query, params, fetch_all=True)
-            return result or []
+            result = await self.execute_query(query, params, fetch_all=True)
+            return list(result or [])
         except Exception as e:
             raise Exception(f"Error finding all in {table}: {e}")
-    
-    def update_one(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any]) -> int:
+
+    async def find_many(
+        self,
+        table: str,
+        filter_dict: Dict[str, Any] = None,
+        columns: Optional[List[str]] = None,
+        order_by: str = 'id',
+        descending: bool = False,
+        after: Optional[Tuple[Any, Any]] = None,
+        limit: int = 100,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, Any]]]:
+        """Find one page of records using keyset pagination on (order_by, id)
+
+        `after` is the key returned with the previous page. Returns the rows
+        and the key to pass as `after` for the next page, or None on the last page.
+        """
+        keys = tuple((filter_dict or {}).keys())
+        if columns:
+            # The pagination key must always be part of the projection
+            columns = tuple(columns) + tuple(c for c in (order_by, 'id') if c not in columns)
+        else:
+            columns = ()
+
+        def build():
+            conditions = _conditions(keys)
+            if after is not None:
+                op = '<' if descending else '>'
+                conditions.append(f"({order_by} {op} %s OR ({order_by} = %s AND id {op} %s))")
+            direction = 'DESC' if descending else 'ASC'
+            query = f"SELECT {', '.join(columns) or '*'} FROM {table}"
+            if conditions:
+                query += f" WHERE {' AND '.join(conditions)}"
+            # Fetch one extra row to know whether there is a next page
+            return query + f" ORDER BY {order_by} {direction}, id {direction} LIMIT %s"
+
+        query = self._sql(
+            ('find_many', table, keys, columns, order_by, descending, after is not None),
+            build,
+        )
+        params = list((filter_dict or {}).values())
+        if after is not None:
+            params.extend([after[0], after[0], after[1]])
+        params.append(limit + 1)
+
+        try:
+            result = list(await self.execute_query(query, tuple(params), fetch_all=True) or [])
+        except Exception as e:
+            raise Exception(f"Error finding many in {table}: {e}")
+
+        if len(result) <= limit:
+            return result, None
+        rows = result[:limit]
+        last = rows[-1]
+        return rows, (last[order_by], last['id'])
+
+    async def stream(
+        self,
+        table: str,
+        filter_dict: Dict[str, Any] = None,
+        columns: Optional[List[str]] = None,
+        order_by: str = 'id',
+        descending: bool = False,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield matching records in chunks from an unbuffered server-side cursor
+
+        The pooled connection is held until the generator is exhausted or closed.
+        """
+        keys = tuple((filter_dict or {}).keys())
+        columns = tuple(columns or ())
+
+        def build():
+            query = f"SELECT {', '.join(columns) or '*'} FROM {table}"
+            if keys:
+                query += f" WHERE {_where(keys)}"
+            return query + f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+
+        query = self._sql(('stream', table, keys, columns, order_by, descending), build)
+        params = tuple(filter_dict.values()) if keys else None
+
+        started = time.monotonic()
+        async with self.get_connection() as connection:
+            pool_wait = time.monotonic() - started
+            total, error = 0, None
+            try:
+                async with connection.cursor(aiomysql.SSDictCursor) as cursor:
+                    try:
+                        await cursor.execute(query, params)
+                    except Error as e:
+                        error = e
+                        raise Exception(f"Error streaming from {table}: {e}")
+                    while True:
+                        rows = await cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        total += len(rows)
+                        yield list(rows)
+            finally:
+                # Duration includes the time the consumer spent between chunks
+                self._emit(query, params, started, pool_wait, total, error)
+
+    def _update_sql(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any]) -> Tuple[str, tuple]:
+        keys = tuple(filter_dict.keys())
+        update_keys = tuple(update_dict.keys())
+        query = self._sql(
+            ('update_one', table, keys, update_keys),
+            lambda: f"UPDATE {table} SET {', '.join([f'{k} = %s' for k in update_keys])} WHERE {_where(keys)}",
+        )
+        return query, tuple(update_dict.values()) + tuple(filter_dict.values())
+
+    async def update_one(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any]) -> int:
         """Update one record"""
-        set_clause = ', '.join([f"{k} = %s" for k in update_dict.keys()])
-        where_clause = ' AND '.join([f"{k} = %s" for k in filter_dict.keys()])
-        query = f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
-        
-        params = tuple(update_dict.values()) + tuple(filter_dict.values())
-        
+        query, params = self._update_sql(table, filter_dict, update_dict)
+
         try:
-            return self.execute_query(query, params)
+            result = await self.execute_query(query, params)
         except Exception as e:
             raise Exception(f"Error updating {table}: {e}")
-    
-    def delete_one(self, table: str, filter_dict: Dict[str, Any]) -> int:
+        await self._notify_write('update', table, filter_dict, update_dict)
+        return result
+
+    async def delete_one(self, table: str, filter_dict: Dict[str, Any]) -> int:
         """Delete one record"""
-        where_clause = ' AND '.join([f"{k} = %s" for k in filter_dict.keys()])
-        query = f"DELETE FROM {table} WHERE {where_clause}"
-        
+        keys = tuple(filter_dict.keys())
+        query = self._sql(
+            ('delete_one', table, keys),
+            lambda: f"DELETE FROM {table} WHERE {_where(keys)}",
+        )
+
+        try:
+            result = await self.execute_query(query, tuple(filter_dict.values()))
+        except Exception as e:
+            raise Exception(f"Error deleting from {table}: {e}")
+        await self._notify_write('delete', table, filter_dict, None)
+        return result
+
+    async def delete_many(self, table: str, filter_dict: Dict[str, Any], limit: Optional[int] = None) -> int:
+        """Delete up to `limit` matching records"""
+        keys = tuple(filter_dict.keys())
+        query = self._sql(
+            ('delete_many', table, keys, limit is not None),
+            lambda: f"DELETE FROM {table} WHERE {_where(keys)}" + (" LIMIT %s" if limit is not None else ""),
+        )
+        params = tuple(filter_dict.values()) + ((limit,) if limit is not None else ())
+
         try:
-            return self.execute_query(query, tuple(filter_dict.values()))
+            result = await self.execute_query(query, params)
         except Exception as e:
             raise Exception(f"Error deleting from {table}: {e}")
-    
-    def count(self, table: str, filter_dict: Dict[str, Any] = None) -> int:
+        if result:
+            await self._notify_write('delete', table, filter_dict, None)
+        return result
+
+    async def count(self, table: str, filter_dict: Dict[str, Any] = None) -> int:
         """Count records"""
-        if filter_dict:
-            where_clause = ' AND '.join([f"{k} = %s" for k in filter_dict.keys()])
-            query = f"SELECT COUNT(*) as count FROM {table} WHERE {where_clause}"
-            params = tuple(filter_dict.values())
-        else:
-            query = f"SELECT COUNT(*) as count FROM {table}"
-            params = None
-        
+        keys = tuple((filter_dict or {}).keys())
+        query = self._sql(
+            ('count', table, keys),
+            lambda: f"SELECT COUNT(*) as count FROM {table}" + (f" WHERE {_where(keys)}" if keys else ""),
+        )
+        params = tuple(filter_dict.values()) if keys else None
+
         try:
-            result = self.execute_query(query, params, fetch_one=True)
+            result = await self.execute_query(query, params, fetch_one=True)
             return result['count'] if result else 0
         except Exception as e:
             raise Exception(f"Error counting in {table}: {e}")
 
+class Transaction:
+    """Statements issued inside MySQLClient.transaction(), all on one connection"""
+
+    def __init__(self, client: MySQLClient, connection):
+        self.client = client
+        self.connection = connection
+        # (operation, table, filter_dict, data) reported to listeners after commit
+        self.writes: List[Tuple[str, str, Optional[Dict[str, Any]], Any]] = []
+
+    async def execute(self, query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False):
+        return await self.client._run(self.connection, query, params, fetch_one, fetch_all, time.monotonic())
+
+    def record_write(self, operation: str, table: str, filter_dict: Optional[Dict[str, Any]], data: Any):
+        """Report a write made with execute() to the listeners once committed"""
+        self.writes.append((operation, table, filter_dict, data))
+
+    async def update_one(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any]) -> int:
+        query, params = self.client._update_sql(table, filter_dict, update_dict)
+        result = await self.execute(query, params)
+        self.record_write('update', table, filter_dict, update_dict)
+        return result
+
 
 # Create global instance
-mysql_client = MySQLClient()
\ No newline at end of file
+mysql_client = MySQLClient()
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+_context: Optional[CryptContext] = None
+_dummy_hash: Optional[str] = None
+
+
+def get_context() -> CryptContext:
+    """CryptContext built from PASSWORD_* env vars (built once per process)
+
+    Argon2id is used for new hashes; bcrypt hashes are still verified and
+    upgraded on the next successful login. Cost changes also trigger a rehash.
+    """
+    global _context
+    if _context is None:
+        _context = CryptContext(
+            schemes=['argon2', 'bcrypt'],
+            default='argon2',
+            deprecated=['bcrypt'],
+            argon2__type='ID',
+            argon2__time_cost=int(os.environ.get('PASSWORD_ARGON2_TIME_COST', '2')),
+            argon2__memory_cost=int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', '19456')),
+            argon2__parallelism=int(os.environ.get('PASSWORD_ARGON2_PARALLELISM', '1')),
+            bcrypt__rounds=int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', '12')),
+        )
+    return _context
+
+
+def is_password_hash(stored: str) -> bool:
+    """True if `stored` is a hash we know, False for legacy plaintext passwords"""
+    return get_context().identify(stored) is not None
+
+
+def _hash(password: str) -> str:
+    return get_context().hash(password)
+
+
+def _verify(password: str, stored: str) -> Tuple[bool, bool]:
+    context = get_context()
+    ok = context.verify(password, stored)
+    return ok, ok and context.needs_update(stored)
+
+
+def _verify_dummy(password: str) -> bool:
+    # Hash of a random password with the current cost settings, made once per process
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = get_context().hash(secrets.token_urlsafe(16))
+    get_context().verify(password, _dummy_hash)
+    return False
+
+
+class PasswordHasher:
+    """Runs KDF work on a bounded executor so it never blocks the event loop
+
+    At most `max_in_flight` hash/verify calls are queued or running at
+    once; further callers wait on a semaphore instead of piling work onto
+    the executor queue.
+    """
+
+    def __init__(self, executor: Executor, max_in_flight: int):
+        self.executor = executor
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def _run(self, fn, *args):
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, stored: str) -> Tuple[bool, bool]:
+        """Return (matches, needs_rehash) for a stored hash"""
+        return await self._run(_verify, password, stored)
+
+    async def verify_unknown(self, password: str) -> bool:
+        """Spend the cost of a verify for a user that does not exist; always False
+
+        Keeps logins for unknown emails as slow as wrong passwords for known
+        ones, so response times do not reveal which emails are registered.
+        """
+        return await self._run(_verify_dummy, password)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def password_hasher_from_env() -> PasswordHasher:
+    """PASSWORD_HASH_EXECUTOR=thread|process, PASSWORD_HASH_WORKERS defaults to the CPU count"""
+    workers = int(os.environ.get('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+    if os.environ.get('PASSWORD_HASH_EXECUTOR', 'thread').lower() == 'process':
+        executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        # argon2-cffi and bcrypt release the GIL while hashing
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='kdf')
+    return PasswordHasher(
+        executor,
+        max_in_flight=int(os.environ.get('PASSWORD_HASH_MAX_IN_FLIGHT', str(workers * 4))),
+    )
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from metrics import Histogram, histogram_lines, sample_line
+
+# Route template of the request being served, set by the API router
+current_route: ContextVar[Optional[str]] = ContextVar('current_route', default=None)
+
+_VALUES_LIST = re.compile(r'VALUES\s*\(.*\)', re.IGNORECASE | re.DOTALL)
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse a query into its shape so identical statements group together"""
+    shape = query.replace('%s', '?')
+    # Multi-row INSERTs differ only in how many value tuples they carry
+    shape = _VALUES_LIST.sub('VALUES (...)', shape)
+    return ' '.join(shape.split())
+
+
+class QueryEvent:
+    """What the data layer reports to hooks after each statement"""
+
+    def __init__(self, query: str, params: Optional[tuple], duration: float, pool_wait: float,
+                 rows: int = 0, error: Optional[Exception] = None):
+        self.query = query
+        self.params = params
+        self.shape = normalize_sql(query)
+        self.duration = duration
+        self.pool_wait = pool_wait
+        self.rows = rows
+        self.error = error
+        self.route = current_route.get()
+
+
+class ShapeStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.pool_wait = Histogram()
+        self.rows = 0
+        self.errors = 0
+
+
+class QueryStats:
+    """Hook that keeps latency/pool-wait histograms, row and error counts per query shape"""
+
+    def __init__(self):
+        self.shapes: Dict[str, ShapeStats] = {}
+
+    def __call__(self, event: QueryEvent):
+        stats = self.shapes.get(event.shape)
+        if stats is None:
+            stats = self.shapes[event.shape] = ShapeStats()
+        stats.latency.observe(event.duration)
+        stats.pool_wait.observe(event.pool_wait)
+        stats.rows += event.rows
+        if event.error is not None:
+            stats.errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            shape: {
+                'latency': stats.latency.to_dict(),
+                'pool_wait': stats.pool_wait.to_dict(),
+                'rows': stats.rows,
+                'errors': stats.errors,
+            }
+            for shape, stats in sorted(self.shapes.items(), key=lambda item: -item[1].latency.sum)
+        }
+
+    def metrics_lines(self) -> List[str]:
+        """Prometheus exposition lines, one series per query shape"""
+        lines = [
+            '# HELP db_query_duration_seconds Statement latency by normalized query shape.',
+            '# TYPE db_query_duration_seconds histogram',
+        ]
+        for shape, stats in sorted(self.shapes.items()):
+            lines += histogram_lines('db_query_duration_seconds', {'shape': shape}, stats.latency)
+        lines += [
+            '# HELP db_query_errors_total Failed statements by normalized query shape.',
+            '# TYPE db_query_errors_total counter',
+        ]
+        for shape, stats in sorted(self.shapes.items()):
+            lines.append(sample_line('db_query_errors_total', {'shape': shape}, stats.errors))
+        return lines
+
+
+class SlowQueryLog:
+    """Hook that logs statements slower than `threshold` seconds
+
+    For slow SELECT shapes it also runs EXPLAIN with the same parameters, at
+    most once per shape every `explain_interval` seconds, and logs the plan.
+    """
+
+    def __init__(self, client, threshold: float = 0.2, explain_interval: float = 300):
+        self.client = client
+        self.threshold = threshold
+        self.explain_interval = explain_interval
+        self._last_explain: Dict[str, float] = {}
+        self.logger = logging.getLogger('slow_query')
+
+    def __call__(self, event: QueryEvent):
+        if event.duration < self.threshold:
+            return
+        self.logger.warning(
+            f"Slow query ({event.duration * 1000:.1f}ms, pool wait {event.pool_wait * 1000:.1f}ms, "
+            f"{event.rows} rows) route={event.route or '-'}: {event.shape}"
+        )
+        if not event.shape.upper().startswith('SELECT'):
+            return
+        now = time.monotonic()
+        if now - self._last_explain.get(event.shape, float('-inf')) < self.explain_interval:
+            return
+        self._last_explain[event.shape] = now
+        try:
+            asyncio.get_running_loop().create_task(self._explain(event))
+        except RuntimeError:
+            pass
+
+    async def _explain(self, event: QueryEvent):
+        try:
+            plan = await self.client.execute_query(f"EXPLAIN {event.query}", event.params, fetch_all=True)
+            self.logger.warning(f"EXPLAIN {event.shape}: {list(plan or [])}")
+        except Exception as e:
+            self.logger.warning(f"EXPLAIN failed for {event.shape}: {e}")
+
+
+def install_query_hooks(client) -> QueryStats:
+    """Attach per-shape stats and the slow-query log to a MySQLClient"""
+    stats = QueryStats()
+    client.add_hook(stats)
+    client.add_hook(SlowQueryLog(
+        client,
+        threshold=float(os.environ.get('MYSQL_SLOW_QUERY_MS', '200')) / 1000,
+        explain_interval=float(os.environ.get('MYSQL_EXPLAIN_INTERVAL', '300')),
+    ))
+    return stats
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class ResetTokenStore:
+    """Valid-token lookups with expiry checked by the store, plus a periodic purge
+
+    Valid tokens are cached in-process for `cache_ttl` seconds (never past
+    their own expiry) so the validate -> reset sequence reads the table once.
+    Any update to a token drops it from the cache.
+    """
+
+    def __init__(self, client, cache_ttl: float = 30, cache_size: int = 10000,
+                 purge_interval: float = 600, purge_batch_size: int = 1000):
+        self.client = client
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.purge_interval = purge_interval
+        self.purge_batch_size = purge_batch_size
+        # token -> (cached_until, row)
+        self._cache: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._task = None
+        self.purged = 0
+        client.add_write_listener(self._on_write)
+
+    async def find_valid(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the unused, unexpired token row or None"""
+        cached = self._cache.get(token)
+        if cached is not None:
+            if time.monotonic() < cached[0]:
+                self._cache.move_to_end(token)
+                return cached[1]
+            del self._cache[token]
+
+        now = datetime.utcnow()
+        # Served by idx_password_reset_tokens_lookup (token, used, expires_at)
+        row = await self.client.find_one(
+            'password_reset_tokens', {'token': token, 'used': False, 'expires_at >': now},
+        )
+        if not row:
+            return None
+
+        seconds_left = (row['expires_at'] - now).total_seconds() if isinstance(row['expires_at'], datetime) else 0
+        ttl = min(self.cache_ttl, seconds_left)
+        if ttl > 0:
+            self._cache[token] = (time.monotonic() + ttl, row)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return row
+
+    async def consume(self, tx, token: str) -> bool:
+        """Mark `token` used inside transaction `tx`; False if it was already used or expired
+
+        Two concurrent resets cannot both succeed: the second conditional
+        update waits on the row lock and then matches nothing.
+        """
+        consumed = await tx.update_one(
+            'password_reset_tokens',
+            {'token': token, 'used': False, 'expires_at >': datetime.utcnow()},
+            {'used': True},
+        )
+        if consumed != 1:
+            self.forget(token)
+            return False
+        return True
+
+    def forget(self, token: str):
+        self._cache.pop(token, None)
+
+    async def _on_write(self, operation: str, table: str, filter_dict, data):
+        if table == 'password_reset_tokens' and filter_dict and 'token' in filter_dict:
+            self.forget(filter_dict['token'])
+
+    async def purge(self) -> int:
+        """Delete expired and used tokens in batches; returns the number removed"""
+        removed = 0
+        # Served by idx_password_reset_tokens_expires_at and idx_password_reset_tokens_used
+        for filter_dict in ({'expires_at <=': datetime.utcnow()}, {'used': True}):
+            while True:
+                deleted = await self.client.delete_many('password_reset_tokens', filter_dict, self.purge_batch_size)
+                removed += deleted
+                if deleted < self.purge_batch_size:
+                    break
+                # Let other queries in between batches
+                await asyncio.sleep(0.05)
+        self.purged += removed
+        return removed
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.purge_interval)
+            try:
+                removed = await self.purge()
+                if removed:
+                    logging.info(f"Purged {removed} password reset tokens")
+            except Exception as e:
+                logging.error(f"Error purging password reset tokens: {str(e)}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def reset_token_store_from_env(client) -> ResetTokenStore:
+    return ResetTokenStore(
+        client,
+        cache_ttl=float(os.environ.get('RESET_TOKEN_CACHE_TTL', '30')),
+        purge_interval=float(os.environ.get('RESET_TOKEN_PURGE_INTERVAL', '600')),
+        purge_batch_size=int(os.environ.get('RESET_TOKEN_PURGE_BATCH_SIZE', '1000')),
+    )
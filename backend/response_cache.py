@@ -0,0 +1,121 @@
+import math
+import os
+import re
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, strip accents and punctuation and collapse whitespace"""
+    text = unicodedata.normalize('NFKD', message.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+def embed(text: str, dims: int = 256) -> Dict[int, float]:
+    """Cheap local embedding: L2-normalized hashed character trigrams
+
+    Good enough to match rephrasings like "treino de peito" and
+    "treino para peito" without calling a model.
+    """
+    padded = f"  {text} "
+    vector: Dict[int, float] = {}
+    for i in range(len(padded) - 2):
+        bucket = zlib.crc32(padded[i:i + 3].encode()) % dims
+        vector[bucket] = vector.get(bucket, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {k: v / norm for k, v in vector.items()}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class ResponseCache:
+    """LRU cache of AI responses keyed on the normalized user message
+
+    Entries expire after `ttl` seconds (0 disables expiry). With
+    `similarity_threshold` > 0, an exact miss falls back to the cached
+    entry whose embedding is most similar, if it is at least that close.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600, similarity_threshold: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        # key -> (response, stored_at, embedding)
+        self._entries: 'OrderedDict[str, Tuple[str, float, Optional[Dict[int, float]]]]' = OrderedDict()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self.ttl) and time.monotonic() - stored_at > self.ttl
+
+    def get(self, message: str) -> Optional[str]:
+        key = normalize_message(message)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._expired(entry[1]):
+                del self._entries[key]
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        if self.similarity_threshold > 0:
+            similar = self._find_similar(key)
+            if similar is not None:
+                self._entries.move_to_end(similar)
+                self.similar_hits += 1
+                return self._entries[similar][0]
+
+        self.misses += 1
+        return None
+
+    def _find_similar(self, key: str) -> Optional[str]:
+        query = embed(key)
+        best_key, best_score = None, self.similarity_threshold
+        for other, (_, stored_at, vector) in self._entries.items():
+            if vector is None or self._expired(stored_at):
+                continue
+            score = cosine(query, vector)
+            if score >= best_score:
+                best_key, best_score = other, score
+        return best_key
+
+    def put(self, message: str, response: str):
+        key = normalize_message(message)
+        vector = embed(key) if self.similarity_threshold > 0 else None
+        self._entries[key] = (response, time.monotonic(), vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'similar_hits': self.similar_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.similar_hits) / lookups if lookups else 0.0,
+        }
+
+
+def response_cache_from_env() -> Optional[ResponseCache]:
+    """Build the chat response cache unless AI_CACHE_ENABLED is false"""
+    if os.environ.get('AI_CACHE_ENABLED', 'true').lower() != 'true':
+        return None
+    return ResponseCache(
+        max_entries=int(os.environ.get('AI_CACHE_MAX_ENTRIES', '1000')),
+        ttl=float(os.environ.get('AI_CACHE_TTL', '3600')),
+        similarity_threshold=float(os.environ.get('AI_CACHE_SIMILARITY', '0')),
+    )
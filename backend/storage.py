@@ -0,0 +1,213 @@
+import logging
+import os
+import time
+import unicodedata
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from query_stats import QueryEvent
+
+# Tables and columns the data layer may reference; mirrors mysql_schema.sql.
+# Identifiers are interpolated into SQL, so anything else is rejected.
+SCHEMA = {
+    'users': {'id', 'name', 'email', 'password', 'created_at'},
+    'status_checks': {'id', 'client_name', 'timestamp'},
+    'password_reset_tokens': {'id', 'user_id', 'token', 'expires_at', 'used', 'created_at'},
+    'chat_messages': {'id', 'session_id', 'user_id', 'message', 'response', 'timestamp'},
+    'workouts': {
+        'id', 'user_id', 'title', 'category', 'exercises', 'duration',
+        'difficulty', 'created_by_ai', 'created_at',
+    },
+}
+
+# Columns holding TIMESTAMPs; routes pass them as ISO strings
+DATETIME_COLUMNS = {'created_at', 'timestamp', 'expires_at'}
+
+# Comparisons allowed in filter keys, e.g. {'expires_at >': now}
+FILTER_OPERATORS = {'=', '!=', '<', '<=', '>', '>='}
+
+# Error number for unique key violations, whatever the backend
+DUPLICATE_KEY = 1062
+
+
+class DatabaseError(Exception):
+    """A statement failed; carries the MySQL error number when there is one"""
+
+    def __init__(self, message: str, errno: Optional[int] = None):
+        super().__init__(message)
+        self.errno = errno
+
+
+def split_filter_key(key: str) -> Tuple[str, str]:
+    """Split a filter key into (column, operator); plain column names mean '='"""
+    column, _, op = key.partition(' ')
+    return column, op or '='
+
+
+def check_names(table: str, names) -> None:
+    """Reject tables, columns and filter operators that are not in SCHEMA"""
+    if table not in SCHEMA:
+        raise Exception(f"Unknown table: {table}")
+    for name in names:
+        if not isinstance(name, str):
+            continue
+        column, op = split_filter_key(name)
+        if column not in SCHEMA[table]:
+            raise Exception(f"Unknown column {column} in {table}")
+        if op not in FILTER_OPERATORS:
+            raise Exception(f"Unknown operator {op} for {column} in {table}")
+
+
+def coerce_value(column: str, value: Any) -> Any:
+    """Turn ISO strings for timestamp columns into datetimes, as MySQL does on insert"""
+    if column in DATETIME_COLUMNS and isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def normalize_email(email: str) -> str:
+    """Fold case, accents and trailing spaces the way the users.email collation does"""
+    if email.isascii():
+        # Nothing to decompose; skips the unicodedata pass for the common case
+        return email.strip().lower()
+    text = unicodedata.normalize('NFKD', email.strip().lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def describe(operation: str, table: str, filter_dict: Optional[Dict[str, Any]], suffix: str = '') -> str:
+    """Query text reported to hooks by non-SQL stores; like a SQL shape it leaves out the values"""
+    return ' '.join([operation, table, *(filter_dict or {}).keys()]) + suffix
+
+
+class Storage:
+    """Data layer the API is written against
+
+    Records are plain dicts addressed by table name, with a string `id`.
+    Filters match columns by equality; a key can add a comparison after a
+    space, e.g. {'expires_at >': now}. Implementations report every
+    statement to the query hooks as a QueryEvent and await the write
+    listeners after each successful write.
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        # Callables invoked with a QueryEvent after every statement
+        self._hooks: List[Callable[[QueryEvent], None]] = []
+        # Coroutines awaited after a successful write: (operation, table, filter, data)
+        self._write_listeners: List[Callable[..., Awaitable[None]]] = []
+
+    def add_hook(self, hook: Callable[[QueryEvent], None]):
+        """Register a callable that receives a QueryEvent after every statement"""
+        self._hooks.append(hook)
+
+    def add_write_listener(self, listener: Callable[..., Awaitable[None]]):
+        """Register a coroutine called as listener(operation, table, filter_dict, data) after writes"""
+        self._write_listeners.append(listener)
+
+    async def _notify_write(self, operation: str, table: str, filter_dict: Optional[Dict[str, Any]], data: Any):
+        for listener in self._write_listeners:
+            try:
+                await listener(operation, table, filter_dict, data)
+            except Exception as e:
+                logging.error(f"Write listener {listener!r} failed: {e}")
+
+    def _emit(self, query: str, params: Optional[tuple], started: float, pool_wait: float,
+              rows: int = 0, error: Optional[Exception] = None):
+        if not self._hooks:
+            return
+        event = QueryEvent(query, params, time.monotonic() - started - pool_wait, pool_wait, rows, error)
+        for hook in self._hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                logging.error(f"Query hook {hook!r} failed: {e}")
+
+    async def connect(self):
+        """Open connections to the store"""
+
+    async def close(self):
+        """Release connections to the store"""
+
+    async def migrate(self) -> List[Any]:
+        """Bring tables and indexes up to date; returns what was applied"""
+        return []
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool usage, suitable for scraping"""
+        return {}
+
+    def transaction(self):
+        """Async context manager yielding an object with update_one(), committed as a unit"""
+        raise NotImplementedError
+
+    async def insert_one(self, table: str, data: Dict[str, Any]) -> str:
+        """Insert one record and return the ID; unique violations raise DatabaseError(errno=DUPLICATE_KEY)"""
+        raise NotImplementedError
+
+    async def insert_many(self, table: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """Insert many records and return their IDs"""
+        raise NotImplementedError
+
+    async def find_one(self, table: str, filter_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def find_all(self, table: str, filter_dict: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def find_many(
+        self,
+        table: str,
+        filter_dict: Dict[str, Any] = None,
+        columns: Optional[List[str]] = None,
+        order_by: str = 'id',
+        descending: bool = False,
+        after: Optional[Tuple[Any, Any]] = None,
+        limit: int = 100,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, Any]]]:
+        """One page ordered by (order_by, id) and the key of the next page, or None on the last one"""
+        raise NotImplementedError
+
+    def stream(
+        self,
+        table: str,
+        filter_dict: Dict[str, Any] = None,
+        columns: Optional[List[str]] = None,
+        order_by: str = 'id',
+        descending: bool = False,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield all matching records in chunks without loading them at once"""
+        raise NotImplementedError
+
+    async def update_one(self, table: str, filter_dict: Dict[str, Any], update_dict: Dict[str, Any]) -> int:
+        """Update matching records; returns how many matched"""
+        raise NotImplementedError
+
+    async def delete_one(self, table: str, filter_dict: Dict[str, Any]) -> int:
+        raise NotImplementedError
+
+    async def delete_many(self, table: str, filter_dict: Dict[str, Any], limit: Optional[int] = None) -> int:
+        """Delete up to `limit` matching records; returns how many were removed"""
+        raise NotImplementedError
+
+    async def count(self, table: str, filter_dict: Dict[str, Any] = None) -> int:
+        raise NotImplementedError
+
+
+def storage_from_env() -> Storage:
+    """STORAGE_BACKEND=mysql|mongo|memory picks the store behind the API (MySQL by default)"""
+    backend = os.environ.get('STORAGE_BACKEND', 'mysql').lower()
+    if backend == 'mysql':
+        from mysql_client import mysql_client
+        return mysql_client
+    if backend == 'mongo':
+        from mongo_client import mongo_client_from_env
+        return mongo_client_from_env()
+    if backend == 'memory':
+        from memory_store import MemoryStorage
+        return MemoryStorage()
+    raise Exception(f"Unknown STORAGE_BACKEND: {backend}")
@@ -0,0 +1,282 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+
+class Span:
+    """One timed operation; times are Unix epoch seconds"""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None,
+                 sampled: bool = True, start: Optional[float] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.start = start if start is not None else time.time()
+        self.end: Optional[float] = None
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'end': self.end,
+            'duration_ms': ((self.end or self.start) - self.start) * 1000,
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(int(self.start * 1e9)),
+            'endTimeUnixNano': str(int((self.end or self.start) * 1e9)),
+            'attributes': [
+                {'key': key, 'value': {'stringValue': str(value)}} for key, value in self.attributes.items()
+            ],
+            'status': {'code': 2, 'message': self.error} if self.error else {'code': 1},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+# Span of the operation currently running; asyncio copies it into child tasks
+current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+class FileExporter:
+    """Append finished spans to a file as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, spans: List[Span]):
+        with open(self.path, 'a') as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + '\n')
+
+    async def export(self, spans: List[Span]):
+        await asyncio.to_thread(self._write, spans)
+
+    async def close(self):
+        pass
+
+
+class OTLPExporter:
+    """POST finished spans to an OTLP/HTTP collector using the JSON encoding"""
+
+    def __init__(self, endpoint: str, service_name: str = 'zeni-backend'):
+        self.endpoint = endpoint.rstrip('/')
+        if not self.endpoint.endswith('/v1/traces'):
+            self.endpoint += '/v1/traces'
+        self.service_name = service_name
+        self._client = httpx.AsyncClient(timeout=5.0)
+
+    async def export(self, spans: List[Span]):
+        payload = {'resourceSpans': [{
+            'resource': {'attributes': [
+                {'key': 'service.name', 'value': {'stringValue': self.service_name}},
+            ]},
+            'scopeSpans': [{'scope': {'name': 'zeni.tracing'}, 'spans': [s.to_otlp() for s in spans]}],
+        }]}
+        response = await self._client.post(self.endpoint, json=payload)
+        response.raise_for_status()
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class Tracer:
+    """Creates spans, samples traces at the root and batches finished spans to an exporter
+
+    With no exporter every span is a cheap unsampled placeholder.
+    """
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0,
+                 batch_size: int = 512, flush_interval: float = 5.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._finished: List[Span] = []
+        self._task = None
+        self.dropped = 0
+
+    def start_span(self, name: str, parent: Optional[Span] = None,
+                   trace_id: Optional[str] = None, parent_id: Optional[str] = None,
+                   sampled: Optional[bool] = None, start: Optional[float] = None) -> Span:
+        parent = parent if parent is not None else current_span.get()
+        if parent is not None:
+            return Span(name, parent.trace_id, parent.span_id, parent.sampled, start)
+        if sampled is None:
+            sampled = self.exporter is not None and random.random() < self.sample_rate
+        return Span(name, trace_id or secrets.token_hex(16), parent_id, sampled, start)
+
+    def finish(self, span: Span, end: Optional[float] = None):
+        span.end = end if end is not None else time.time()
+        if not span.sampled or self.exporter is None:
+            return
+        if len(self._finished) >= self.batch_size * 10:
+            # Exporter is not keeping up; shed spans instead of growing memory
+            self.dropped += 1
+            return
+        self._finished.append(span)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Run the block inside a child span of the current span"""
+        span = self.start_span(name)
+        for key, value in attributes.items():
+            span.set_attribute(key, value)
+        token = current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.error = str(e)
+            raise
+        finally:
+            current_span.reset(token)
+            self.finish(span)
+
+    def record(self, name: str, start: float, end: float, error: Optional[str] = None, **attributes):
+        """Record an already-finished operation as a child of the current span"""
+        parent = current_span.get()
+        if parent is None or not parent.sampled:
+            return
+        span = self.start_span(name, parent=parent, start=start)
+        span.attributes.update(attributes)
+        span.error = error
+        self.finish(span, end)
+
+    def start(self):
+        if self.exporter is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def flush(self):
+        while self._finished:
+            batch = self._finished[:self.batch_size]
+            del self._finished[:self.batch_size]
+            try:
+                await self.exporter.export(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                logging.warning(f"Error exporting {len(batch)} spans: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.exporter is not None:
+            await self.flush()
+            await self.exporter.close()
+
+
+def parse_traceparent(header: Optional[str]):
+    """Return (trace_id, parent_id, sampled) from a W3C traceparent header, or None"""
+    if not header:
+        return None
+    parts = header.strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2], parts[3] == '01'
+
+
+class TracingMiddleware:
+    """ASGI middleware opening one root span per HTTP request
+
+    Joins the caller's trace when a traceparent header is present, and
+    renames the span to the matched route template once routing is done.
+    """
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get('headers') or [])
+        incoming = parse_traceparent(headers.get(b'traceparent', b'').decode() or None)
+        if incoming:
+            span = self.tracer.start_span('HTTP', trace_id=incoming[0], parent_id=incoming[1], sampled=incoming[2])
+        else:
+            span = self.tracer.start_span('HTTP')
+        span.set_attribute('http.method', scope['method'])
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                span.set_attribute('http.status_code', message['status'])
+            await send(message)
+
+        token = current_span.set(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            span.error = str(e)
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get('route')
+            span.name = f"{scope['method']} {getattr(route, 'path', None) or 'unmatched'}"
+            self.tracer.finish(span)
+
+
+def tracing_hook(tracer: Tracer):
+    """MySQLClient hook turning each QueryEvent into pool-wait and statement spans"""
+    def hook(event):
+        end = time.time()
+        query_start = end - event.duration
+        if event.pool_wait:
+            tracer.record('db.pool_wait', query_start - event.pool_wait, query_start)
+        tracer.record(
+            'db.query', query_start, end,
+            error=str(event.error) if event.error else None,
+            **{'db.statement': event.shape, 'db.rows': event.rows},
+        )
+    return hook
+
+
+def tracer_from_env() -> Tracer:
+    """TRACE_EXPORTER=file|otlp enables tracing; TRACE_SAMPLE_RATE sets the root sampling ratio"""
+    name = os.environ.get('TRACE_EXPORTER', '').lower()
+    exporter = None
+    if name == 'file':
+        exporter = FileExporter(os.environ.get('TRACE_FILE', 'traces.jsonl'))
+    elif name == 'otlp':
+        exporter = OTLPExporter(
+            os.environ.get('TRACE_OTLP_ENDPOINT', 'http://localhost:4318'),
+            os.environ.get('TRACE_SERVICE_NAME', 'zeni-backend'),
+        )
+    return Tracer(exporter, sample_rate=float(os.environ.get('TRACE_SAMPLE_RATE', '0.1')))
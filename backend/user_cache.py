@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from password_hasher import is_password_hash
+from storage import normalize_email
+
+# Channel on the shared store that tells every worker to drop a user's entry
+INVALIDATION_CHANNEL = 'user:invalidate'
+
+
+class LocalStore:
+    """In-process key/value store with TTL, shaped like the async Redis API
+
+    Stands in for the shared store in tests and single-worker deployments.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() > expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None):
+        self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def publish(self, channel: str, message: str) -> int:
+        # One process, so there is nobody else to tell
+        return 0
+
+
+class UserCache:
+    """Read-through cache of users rows keyed by normalized email
+
+    Lookups hit an in-process LRU first, then the optional shared store,
+    then MySQL. Plaintext passwords are never cached: hashed rows keep their
+    KDF hash as password_hash, and legacy plaintext rows only carry an HMAC
+    digest checked with legacy_password_matches(). Entries are dropped when
+    MySQLClient reports a write to the users table.
+
+    With a shared store the invalidation is also published on
+    INVALIDATION_CHANNEL, and start() subscribes to it, so a password
+    change on one worker evicts the entry from every worker's LRU instead
+    of leaving it there for up to `ttl` seconds. Without a shared store
+    each worker only sees its own writes.
+
+    Keys are folded with normalize_email, as the users.email collation
+    folds them, so every spelling of an address shares one entry. A lookup
+    only caches what it read if no invalidation ran while it was reading.
+    """
+
+    def __init__(self, client, ttl: float = 60, max_entries: int = 10000,
+                 shared_store=None, secret: Optional[bytes] = None):
+        self.client = client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared_store = shared_store
+        # Must be the same on every worker that shares a store
+        self.secret = secret or secrets.token_bytes(32)
+        # normalized email -> (stored_at, entry)
+        self._local: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._email_by_id: Dict[str, str] = {}
+        # Bumped by every invalidation; a miss that saw it change does not cache its row.
+        # Invalidations by id may not know the email, so one counter covers all keys.
+        self._generation = 0
+        self._task = None
+        self.hits = 0
+        self.misses = 0
+        client.add_write_listener(self._on_write)
+
+    def _digest(self, password: str) -> str:
+        return hmac.new(self.secret, password.encode(), hashlib.sha256).hexdigest()
+
+    def _to_entry(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        entry = {k: v for k, v in row.items() if k != 'password'}
+        if 'created_at' in entry and not isinstance(entry['created_at'], str):
+            entry['created_at'] = entry['created_at'].isoformat()
+        if is_password_hash(row['password']):
+            entry['password_hash'] = row['password']
+        else:
+            entry['password_digest'] = self._digest(row['password'])
+        return entry
+
+    def legacy_password_matches(self, entry: Dict[str, Any], password: str) -> bool:
+        """Check a password against a row that still stores it in plaintext"""
+        return 'password_digest' in entry and hmac.compare_digest(entry['password_digest'], self._digest(password))
+
+    def _remember(self, email: str, entry: Dict[str, Any]):
+        self._local[email] = (time.monotonic(), entry)
+        self._local.move_to_end(email)
+        self._email_by_id[entry['id']] = email
+        while len(self._local) > self.max_entries:
+            _, (_, evicted) = self._local.popitem(last=False)
+            self._email_by_id.pop(evicted['id'], None)
+
+    async def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Return the cached user entry for `email`, loading it on a miss"""
+        key = normalize_email(email)
+        generation = self._generation
+        cached = self._local.get(key)
+        if cached is not None and time.monotonic() - cached[0] <= self.ttl:
+            self._local.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        if self.shared_store is not None:
+            raw = await self.shared_store.get(f"user:email:{key}")
+            if raw is not None:
+                entry = json.loads(raw)
+                if generation == self._generation:
+                    self._remember(key, entry)
+                self.hits += 1
+                return entry
+
+        self.misses += 1
+        row = await self.client.find_one('users', {'email': email})
+        if not row:
+            return None
+        entry = self._to_entry(row)
+        if generation != self._generation:
+            # The row may predate a write that was invalidated meanwhile
+            return entry
+        self._remember(key, entry)
+        if self.shared_store is not None:
+            await self.shared_store.set(f"user:email:{key}", json.dumps(entry), ex=int(self.ttl))
+            await self.shared_store.set(f"user:id:{entry['id']}", key, ex=int(self.ttl))
+        return entry
+
+    def _forget(self, email: Optional[str] = None, user_id: Optional[str] = None):
+        """Drop the local entry for `email`, or for `user_id` when the email is not known here"""
+        self._generation += 1
+        if email is not None:
+            email = normalize_email(email)
+        elif user_id is not None:
+            email = self._email_by_id.get(user_id)
+        if email is not None:
+            cached = self._local.pop(email, None)
+            if cached is not None:
+                self._email_by_id.pop(cached[1]['id'], None)
+
+    async def invalidate(self, email: Optional[str] = None, user_id: Optional[str] = None):
+        if email is not None:
+            email = normalize_email(email)
+        if user_id is not None and email is None:
+            email = self._email_by_id.get(user_id)
+            if email is None and self.shared_store is not None:
+                email = await self.shared_store.get(f"user:id:{user_id}")
+        self._forget(email, user_id)
+        if self.shared_store is not None:
+            keys = [f"user:email:{email}"] if email else []
+            if user_id:
+                keys.append(f"user:id:{user_id}")
+            if keys:
+                await self.shared_store.delete(*keys)
+                # Other workers may hold the entry in their LRU; the id covers
+                # workers that cached it after the shared id key expired
+                await self.shared_store.publish(INVALIDATION_CHANNEL, json.dumps({'email': email, 'id': user_id}))
+
+    async def _listen(self):
+        """Drop local entries invalidated by other workers"""
+        while True:
+            pubsub = self.shared_store.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Messages may have been missed while not subscribed
+                self._generation += 1
+                self._local.clear()
+                self._email_by_id.clear()
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        keys = json.loads(message['data'])
+                        self._forget(keys.get('email'), keys.get('id'))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"User cache invalidation listener failed, resubscribing: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
+
+    def start(self):
+        """Subscribe to invalidations from other workers when the shared store supports it"""
+        if self._task is None and hasattr(self.shared_store, 'pubsub'):
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _on_write(self, operation: str, table: str, filter_dict, data):
+        if table != 'users':
+            return
+        if operation == 'insert':
+            await self.invalidate(email=data.get('email'), user_id=data.get('id'))
+            return
+        filter_dict = filter_dict or {}
+        await self.invalidate(email=filter_dict.get('email'), user_id=filter_dict.get('id'))
+        if data and data.get('email'):
+            await self.invalidate(email=data['email'])
+
+    def stats(self) -> Dict[str, Any]:
+        return {'entries': len(self._local), 'hits': self.hits, 'misses': self.misses}
+
+
+def user_cache_from_env(client) -> UserCache:
+    """USER_CACHE_REDIS_URL adds a shared Redis store; USER_CACHE_SECRET keys the digests
+
+    Run several workers only with USER_CACHE_REDIS_URL set (or a short
+    USER_CACHE_TTL): without it a worker keeps serving a user's old
+    password for up to USER_CACHE_TTL seconds after another worker changes it.
+    """
+    shared_store = None
+    redis_url = os.environ.get('USER_CACHE_REDIS_URL')
+    if redis_url:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise Exception("USER_CACHE_REDIS_URL requires the redis package")
+        shared_store = redis.from_url(redis_url, decode_responses=True)
+    secret = os.environ.get('USER_CACHE_SECRET')
+    if shared_store is not None and not secret:
+        raise Exception("USER_CACHE_REDIS_URL requires USER_CACHE_SECRET so digests match across workers")
+    return UserCache(
+        client,
+        ttl=float(os.environ.get('USER_CACHE_TTL', '60')),
+        max_entries=int(os.environ.get('USER_CACHE_MAX_ENTRIES', '10000')),
+        shared_store=shared_store,
+        secret=secret.encode() if secret else None,
+    )
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List
+
+
+# MySQL errors worth retrying later: lost or refused connections, lock timeouts, deadlocks
+TRANSIENT_ERRNOS = {1040, 1205, 1213, 2002, 2003, 2006, 2013}
+
+
+def is_transient(error: Exception) -> bool:
+    """True unless the store rejected the row itself (bad foreign key, duplicate, too long, ...)"""
+    errno = getattr(error, 'errno', None)
+    return errno is None or errno in TRANSIENT_ERRNOS
+
+
+class WriteBehindBuffer:
+    """Queue rows in memory and insert them into one table in batches
+
+    Rows are flushed with insert_many when max_batch_size rows are waiting
+    or flush_interval seconds have passed, whichever comes first, and once
+    more when the buffer is stopped. Rows leave the queue only once they
+    are written. When a batch fails its rows are retried one by one; a row
+    the store rejects is dropped and logged so it cannot block the rows
+    behind it, while a transient error leaves the rest queued.
+    """
+
+    def __init__(self, client, table: str, max_batch_size: int = 200,
+                 flush_interval: float = 0.5, max_queue_size: int = 10000):
+        self.client = client
+        self.table = table
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self._rows: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._task = None
+        self.flushed_rows = 0
+        self.flush_count = 0
+        self.flush_failures = 0
+        self.dropped_rows = 0
+        self.inline_writes = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._rows)
+
+    def start(self):
+        """Start the background flush loop on the running event loop"""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still queued"""
+        if self._task is not None:
+            # Let a flush in progress finish rather than cancelling it mid-write
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._rows:
+            logging.error(f"Abandoning {len(self._rows)} rows for {self.table} that could not be written before shutdown")
+
+    async def add(self, row: Dict[str, Any]):
+        """Queue a row; writes it inline when the queue is full"""
+        if self.depth >= self.max_queue_size:
+            await self.flush()
+            if self.depth >= self.max_queue_size:
+                # Backpressure: the caller pays for the write instead of growing memory
+                self.inline_writes += 1
+                await self.client.insert_one(self.table, row)
+                return
+        self._rows.append(row)
+        if self.depth >= self.max_batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Insert queued rows in batches of at most max_batch_size"""
+        async with self._flush_lock:
+            while self._rows:
+                batch = self._rows[:self.max_batch_size]
+                try:
+                    await self.client.insert_many(self.table, batch)
+                except Exception as e:
+                    self.flush_failures += 1
+                    logging.error(f"Error flushing {len(batch)} rows into {self.table}: {str(e)}")
+                    if not await self._write_one_by_one(batch):
+                        return
+                    continue
+                # add() only appends, so the batch is still at the head of the queue
+                del self._rows[:len(batch)]
+                self.flushed_rows += len(batch)
+                self.flush_count += 1
+
+    async def _write_one_by_one(self, batch: List[Dict[str, Any]]) -> bool:
+        """Write a failed batch row by row; False if a transient error stopped it"""
+        for row in batch:
+            try:
+                await self.client.insert_one(self.table, row)
+                self.flushed_rows += 1
+            except Exception as e:
+                if is_transient(e):
+                    logging.error(f"Error writing into {self.table}, will retry: {str(e)}")
+                    return False
+                self.dropped_rows += 1
+                logging.error(f"Dropping row {row.get('id')} for {self.table}: {str(e)}")
+            del self._rows[0]
+        return True
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"Error in {self.table} flush loop: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'table': self.table,
+            'queue_depth': self.depth,
+            'max_queue_size': self.max_queue_size,
+            'flushed_rows': self.flushed_rows,
+            'flush_count': self.flush_count,
+            'flush_failures': self.flush_failures,
+            'dropped_rows': self.dropped_rows,
+            'inline_writes': self.inline_writes,
+        }
+
+
+def chat_buffer_from_env(client):
+    """Build the chat_messages buffer if CHAT_WRITE_BEHIND is enabled, else None"""
+    if os.environ.get('CHAT_WRITE_BEHIND', 'false').lower() != 'true':
+        return None
+    return WriteBehindBuffer(
+        client,
+        'chat_messages',
+        max_batch_size=int(os.environ.get('CHAT_WRITE_BEHIND_BATCH_SIZE', '200')),
+        flush_interval=float(os.environ.get('CHAT_WRITE_BEHIND_INTERVAL', '0.5')),
+        max_queue_size=int(os.environ.get('CHAT_WRITE_BEHIND_MAX_QUEUE', '10000')),
+    )
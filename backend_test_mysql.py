@@ -18,10 +18,23 @@ def get_backend_url():
         print(f"Error reading .env file: {e}")
         return None
 
+# Serve backend/server.py inside this process on the embedded store (--in-process)
+def in_process_client():
+    os.environ.setdefault('STORAGE_BACKEND', 'memory')
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+    from fastapi.testclient import TestClient
+    from server import app
+    client = TestClient(app)
+    # Entering the client runs the startup handlers
+    client.__enter__()
+    return client
+
 # Main test class for MySQL Backend
 class MySQLBackendTester:
-    def __init__(self):
-        self.backend_url = get_backend_url()
+    def __init__(self, http=None):
+        # `requests` against a deployment, or an in-process TestClient
+        self.http = http or requests
+        self.backend_url = str(http.base_url).rstrip('/') if http else get_backend_url()
         if not self.backend_url:
             print("Error: Could not determine backend URL")
             sys.exit(1)
@@ -98,7 +111,7 @@ class MySQLBackendTester:
         """Test the health check endpoint"""
         print("\n--- Testing Health Check Endpoint ---")
         try:
-            response = requests.get(f"{self.api_url}/")
+            response = self.http.get(f"{self.api_url}/")
             print(f"Status Code: {response.status_code}")
             print(f"Response: {response.text}")
             
@@ -119,7 +132,7 @@ class MySQLBackendTester:
         print("\n--- Testing User Registration ---")
         try:
             print(f"Registering user: {self.test_user['name']} with email: {self.test_user['email']}")
-            response = requests.post(
+            response = self.http.post(
                 f"{self.api_url}/register",
                 json=self.test_user
             )
@@ -149,7 +162,7 @@ class MySQLBackendTester:
             }
             print(f"Logging in with email: {login_data['email']}")
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.api_url}/login",
                 json=login_data
             )
@@ -177,7 +190,7 @@ class MySQLBackendTester:
             }
             print(f"Creating status check with client name: {status_data['client_name']}")
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.api_url}/status",
                 json=status_data
             )
@@ -200,7 +213,7 @@ class MySQLBackendTester:
         """Test getting status checks"""
         print("\n--- Testing Get Status Checks ---")
         try:
-            response = requests.get(f"{self.api_url}/status")
+            response = self.http.get(f"{self.api_url}/status")
             print(f"Status Code: {response.status_code}")
             print(f"Response: {response.text}")
             
@@ -223,7 +236,7 @@ class MySQLBackendTester:
             }
             print(f"Requesting password reset for: {forgot_data['email']}")
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.api_url}/forgot-password",
                 json=forgot_data
             )
@@ -254,7 +267,7 @@ class MySQLBackendTester:
                 print("❌ No reset token available for validation")
                 return
             
-            response = requests.get(f"{self.api_url}/validate-reset-token/{self.reset_token}")
+            response = self.http.get(f"{self.api_url}/validate-reset-token/{self.reset_token}")
             print(f"Status Code: {response.status_code}")
             print(f"Response: {response.text}")
             
@@ -285,7 +298,7 @@ class MySQLBackendTester:
                 "confirm_password": new_password
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.api_url}/reset-password",
                 json=reset_data
             )
@@ -321,7 +334,7 @@ class MySQLBackendTester:
             }
             print(f"Sending chat message: {chat_data['message']}")
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.api_url}/chat",
                 json=chat_data
             )
@@ -344,7 +357,7 @@ class MySQLBackendTester:
         """Test getting chat history"""
         print("\n--- Testing Chat History ---")
         try:
-            response = requests.get(f"{self.api_url}/chat/{self.session_id}")
+            response = self.http.get(f"{self.api_url}/chat/{self.session_id}")
             print(f"Status Code: {response.status_code}")
             print(f"Response: {response.text}")
             
@@ -396,7 +409,7 @@ class MySQLBackendTester:
             }
             print(f"Saving workout: {workout_data['title']}")
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.api_url}/workouts",
                 json=workout_data
             )
@@ -419,7 +432,7 @@ class MySQLBackendTester:
         """Test getting user workouts"""
         print("\n--- Testing Get User Workouts ---")
         try:
-            response = requests.get(f"{self.api_url}/workouts/{self.user_id}")
+            response = self.http.get(f"{self.api_url}/workouts/{self.user_id}")
             print(f"Status Code: {response.status_code}")
             print(f"Response: {response.text}")
             
@@ -456,5 +469,5 @@ class MySQLBackendTester:
             print("❌ Several tests failed. MySQL migration needs investigation.")
 
 if __name__ == "__main__":
-    tester = MySQLBackendTester()
+    tester = MySQLBackendTester(in_process_client() if "--in-process" in sys.argv else None)
     tester.run_all_tests()
\ No newline at end of file
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+API load test
+Replays the user journey register -> login -> chat burst -> chat history ->
+save workout -> workout list against /api, either with a fixed number of
+concurrent virtual users or at a target rate of new sessions per second.
+Reports p50/p95/p99 latency, throughput and error rate per endpoint, and
+can save the results as a baseline or compare them with one.
+
+Usage: python benchmarks/load_test.py [--url http://localhost:8001 | --in-process]
+                                      [--concurrency 20 | --rps 10] [--duration 30]
+                                      [--chat-burst 5] [--save baseline.json]
+                                      [--compare baseline.json --tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+class Recorder:
+    """Latency samples and error counts per endpoint (method + route template)"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint, elapsed, ok):
+        self.latencies.setdefault(endpoint, []).append(elapsed)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, duration):
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            errors = self.errors.get(endpoint, 0)
+            endpoints[endpoint] = {
+                'requests': len(samples),
+                'errors': errors,
+                'error_rate': errors / len(samples),
+                'throughput_rps': len(samples) / duration,
+                'p50_ms': percentile(ordered, 0.50) * 1000,
+                'p95_ms': percentile(ordered, 0.95) * 1000,
+                'p99_ms': percentile(ordered, 0.99) * 1000,
+            }
+        total = sum(len(s) for s in self.latencies.values())
+        errors = sum(self.errors.values())
+        return {
+            'duration_s': duration,
+            'requests': total,
+            'errors': errors,
+            'error_rate': errors / total if total else 0.0,
+            'throughput_rps': total / duration,
+            'endpoints': endpoints,
+        }
+
+
+async def call(client, recorder, endpoint, method, path, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, path, **kwargs)
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        response, ok = None, False
+    recorder.record(endpoint, time.perf_counter() - started, ok)
+    return response if ok else None
+
+
+async def journey(client, recorder, chat_burst):
+    """One user's session; stops early if a step the next ones depend on fails"""
+    unique = uuid.uuid4().hex[:12]
+    email = f'load-{unique}@example.com'
+    password = 'MinhaSenh@123'
+
+    registered = await call(client, recorder, 'POST /api/register', 'POST', '/api/register',
+                            json={'name': f'Carga {unique}', 'email': email, 'password': password})
+    if registered is None:
+        return
+    login = await call(client, recorder, 'POST /api/login', 'POST', '/api/login',
+                       json={'email': email, 'password': password})
+    if login is None:
+        return
+    body = login.json()
+    user_id = body['user_id']
+    headers = {'Authorization': f"Bearer {body['access_token']}"} if body.get('access_token') else {}
+
+    session_id = str(uuid.uuid4())
+    for i in range(chat_burst):
+        await call(client, recorder, 'POST /api/chat', 'POST', '/api/chat', headers=headers,
+                   json={'session_id': session_id, 'user_id': user_id, 'message': f'Treino para pernas {i}?'})
+    await call(client, recorder, 'GET /api/chat/{session_id}', 'GET', f'/api/chat/{session_id}', headers=headers)
+
+    await call(client, recorder, 'POST /api/workouts', 'POST', '/api/workouts', headers=headers, json={
+        'user_id': user_id, 'title': 'Treino A', 'category': 'forca', 'duration': '45 min',
+        'difficulty': 'medio', 'exercises': [{'name': 'Agachamento', 'sets': 3, 'reps': 10}],
+    })
+    await call(client, recorder, 'GET /api/workouts/{user_id}', 'GET', f'/api/workouts/{user_id}', headers=headers)
+
+
+async def closed_loop(client, recorder, concurrency, duration, chat_burst):
+    """`concurrency` virtual users, each starting a new journey as soon as one ends"""
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        while time.perf_counter() < deadline:
+            await journey(client, recorder, chat_burst)
+
+    await asyncio.gather(*[user() for _ in range(concurrency)])
+
+
+async def open_loop(client, recorder, rps, duration, chat_burst, max_in_flight):
+    """Start `rps` journeys per second regardless of how fast they finish"""
+    semaphore = asyncio.Semaphore(max_in_flight)
+    tasks = []
+    started = time.perf_counter()
+    skipped = 0
+
+    async def limited():
+        try:
+            await journey(client, recorder, chat_burst)
+        finally:
+            semaphore.release()
+
+    n = 0
+    while True:
+        due = started + n / rps
+        if due - started >= duration:
+            break
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        n += 1
+        if semaphore.locked():
+            # The server is not keeping up; count it instead of queueing forever
+            skipped += 1
+            continue
+        await semaphore.acquire()
+        tasks.append(asyncio.create_task(limited()))
+    await asyncio.gather(*tasks)
+    return skipped
+
+
+def make_client(args):
+    """HTTP client for the target, plus the app when it is served in this process"""
+    if not args.in_process:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout,
+                                   limits=httpx.Limits(max_connections=args.max_in_flight))
+        return client, None
+    # Serve the app in this process on the embedded store; no database needed
+    os.environ.setdefault('STORAGE_BACKEND', 'memory')
+    sys.path.insert(0, str(BACKEND_DIR))
+    from server import app
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://testserver',
+                               timeout=args.timeout)
+    return client, app
+
+
+async def run(args):
+    recorder = Recorder()
+    client, app = make_client(args)
+    if app is not None:
+        # ASGITransport does not send lifespan events
+        await app.router.startup()
+    started = time.perf_counter()
+    skipped = 0
+    try:
+        async with client:
+            if args.rps:
+                skipped = await open_loop(client, recorder, args.rps, args.duration, args.chat_burst,
+                                          args.max_in_flight)
+            else:
+                await closed_loop(client, recorder, args.concurrency, args.duration, args.chat_burst)
+    finally:
+        if app is not None:
+            await app.router.shutdown()
+    result = recorder.summary(time.perf_counter() - started)
+    result['config'] = {
+        'mode': f"rps={args.rps}" if args.rps else f"concurrency={args.concurrency}",
+        'target': 'in-process' if args.in_process else args.url,
+        'chat_burst': args.chat_burst,
+        'skipped_journeys': skipped,
+    }
+    return result
+
+
+def print_summary(result):
+    print(f"\n{result['requests']} requests in {result['duration_s']:.1f}s "
+          f"({result['throughput_rps']:.1f} req/s, {result['error_rate'] * 100:.2f}% errors, "
+          f"{result['config']['mode']})")
+    if result['config']['skipped_journeys']:
+        print(f"Skipped {result['config']['skipped_journeys']} journeys: too many in flight")
+    print(f"{'endpoint':<32}{'reqs':>7}{'err%':>7}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for endpoint, stats in result['endpoints'].items():
+        print(f"{endpoint:<32}{stats['requests']:>7}{stats['error_rate'] * 100:>7.2f}"
+              f"{stats['throughput_rps']:>8.1f}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+
+
+def compare(result, baseline, tolerance):
+    """Regressions beyond `tolerance` (a fraction) in p95, p99, error rate or throughput"""
+    regressions = []
+    for endpoint, before in baseline['endpoints'].items():
+        after = result['endpoints'].get(endpoint)
+        if after is None:
+            regressions.append(f"{endpoint}: no requests in this run")
+            continue
+        for key in ('p95_ms', 'p99_ms'):
+            if after[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{endpoint}: {key} {before[key]:.1f} -> {after[key]:.1f}")
+        if after['error_rate'] > before['error_rate'] + tolerance / 10:
+            regressions.append(f"{endpoint}: error rate {before['error_rate']:.3f} -> {after['error_rate']:.3f}")
+    if result['throughput_rps'] < baseline['throughput_rps'] * (1 - tolerance):
+        regressions.append(f"throughput {baseline['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the /api endpoints")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', default='http://localhost:8001')
+    target.add_argument('--in-process', action='store_true', help="serve the app in this process (memory store)")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument('--concurrency', type=int, default=20, help="virtual users in a closed loop")
+    load.add_argument('--rps', type=float, help="new journeys per second in an open loop")
+    parser.add_argument('--duration', type=float, default=30, help="seconds")
+    parser.add_argument('--chat-burst', type=int, default=5, help="chat messages per journey")
+    parser.add_argument('--max-in-flight', type=int, default=200)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--save', help="write the results as a JSON baseline")
+    parser.add_argument('--compare', help="baseline JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed regression as a fraction")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print_summary(result)
+    if args.save:
+        Path(args.save).write_text(json.dumps(result, indent=2))
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        regressions = compare(result, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
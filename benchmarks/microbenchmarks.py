@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for per-request hot paths
+Times datetime conversion, Pydantic model construction, SQL building in
+MySQLClient (against a stand-in that skips the network), lookups on the
+memory store, and row-to-response conversion. Results are JSON; each case
+is also reported relative to a fixed pure-Python calibration loop, and
+that ratio is what gets compared with the baseline, so a baseline
+recorded on another machine stays usable.
+
+Usage: python benchmarks/microbenchmarks.py [--json out.json] [--save]
+                                            [--baseline benchmarks/microbenchmarks_baseline.json]
+                                            [--tolerance 0.3] [--filter name]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / 'backend'))
+# Importing the app must not need a database
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+os.environ.setdefault('MIGRATE_ON_STARTUP', 'false')
+
+from fastapi.encoders import jsonable_encoder
+
+from memory_store import MemoryStorage
+from server import (
+    ChatMessage, StatusCheck, WorkoutPlan, convert_datetime_to_string, json_default,
+)
+
+DEFAULT_BASELINE = BENCH_DIR / 'microbenchmarks_baseline.json'
+
+EXERCISES = [
+    {'name': 'Agachamento', 'sets': 3, 'reps': 12, 'weight': 'Peso corporal'},
+    {'name': 'Flexão de braço', 'sets': 3, 'reps': 10, 'weight': 'Peso corporal'},
+    {'name': 'Prancha', 'sets': 3, 'reps': '30 segundos', 'weight': 'Peso corporal'},
+]
+
+
+def calibration():
+    total = 0
+    for i in range(1000):
+        total += i * i
+    return total
+
+
+def workout_row(i=0):
+    return {
+        'id': str(uuid.uuid4()), 'user_id': 'u1', 'title': f'Treino {i}', 'category': 'Força',
+        'exercises': json.dumps(EXERCISES), 'duration': '45 minutos', 'difficulty': 'Iniciante',
+        'created_by_ai': 0, 'created_at': datetime(2026, 1, 1) + timedelta(minutes=i),
+    }
+
+
+def mysql_stand_in():
+    """MySQLClient whose execute_query returns a canned row instead of going to MySQL"""
+    from mysql_client import MySQLClient
+
+    client = MySQLClient()
+    row = {'id': 'u1', 'name': 'Maria', 'email': 'maria@example.com', 'password': 'x',
+           'created_at': datetime(2026, 1, 1)}
+
+    async def execute_query(query, params=None, fetch_one=False, fetch_all=False):
+        return row if fetch_one else [row] if fetch_all else 1
+
+    client.execute_query = execute_query
+    return client
+
+
+def sync_cases():
+    status = StatusCheck(client_name='benchmark').model_dump()
+    workout = WorkoutPlan(user_id='u1', title='Treino A', category='Força', exercises=EXERCISES,
+                          duration='45 minutos', difficulty='Iniciante').model_dump()
+    status_rows = [{'id': str(uuid.uuid4()), 'client_name': 'benchmark', 'timestamp': datetime(2026, 1, 1)}
+                   for _ in range(100)]
+    workout_rows = [workout_row(i) for i in range(100)]
+
+    return {
+        'calibration': calibration,
+        'convert_datetime_to_string.status': lambda: convert_datetime_to_string(status),
+        'convert_datetime_to_string.workout': lambda: convert_datetime_to_string(workout),
+        'model.StatusCheck': lambda: StatusCheck(client_name='benchmark'),
+        'model.ChatMessage': lambda: ChatMessage(
+            session_id='s1', user_id='u1', message='Treino para pernas?', response='Resposta da IA'),
+        'model.WorkoutPlan': lambda: WorkoutPlan(
+            user_id='u1', title='Treino A', category='Força', exercises=EXERCISES,
+            duration='45 minutos', difficulty='Iniciante'),
+        'response.status_checks_100': lambda: [StatusCheck(**row) for row in status_rows],
+        'response.workouts_100_encoder': lambda: jsonable_encoder(workout_rows),
+        'response.workouts_100_stream': lambda: ','.join(json.dumps(row, default=json_default)
+                                                        for row in workout_rows),
+    }
+
+
+def async_cases():
+    mysql = mysql_stand_in()
+    memory = MemoryStorage()
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(memory.insert_many('users', [
+        {'id': f'u{i}', 'name': f'User {i}', 'email': f'user{i}@example.com', 'password': 'x'}
+        for i in range(10000)
+    ]))
+    loop.run_until_complete(memory.insert_many('workouts', [workout_row(i) for i in range(1000)]))
+
+    return loop, {
+        'mysql.find_one.sql': lambda: mysql.find_one('users', {'email': 'maria@example.com'}),
+        'mysql.update_one.sql': lambda: mysql.update_one('users', {'id': 'u1'}, {'password': 'y'}),
+        'memory.find_one.email': lambda: memory.find_one('users', {'email': 'user5000@example.com'}),
+        'memory.update_one.id': lambda: memory.update_one('users', {'id': 'u5000'}, {'name': 'Renamed'}),
+        'memory.find_many.workouts_page': lambda: memory.find_many(
+            'workouts', {'user_id': 'u1'}, order_by='created_at', descending=True, limit=100),
+    }
+
+
+def measure(run_loops, min_time=0.2, repeat=5):
+    """Best time per call in nanoseconds, timeit-style: grow the loop count, then take the fastest repeat"""
+    loops = 1
+    while True:
+        elapsed = run_loops(loops)
+        if elapsed >= min_time / 10:
+            break
+        loops *= 10
+    loops = max(1, int(loops * (min_time / 10) / max(elapsed, 1e-9)) * 10)
+    best = min(run_loops(loops) for _ in range(repeat))
+    return best / loops * 1e9, loops
+
+
+def run(selected):
+    results = {}
+
+    def record(name, run_loops):
+        if selected and selected not in name and name != 'calibration':
+            return
+        ns, loops = measure(run_loops)
+        results[name] = {'ns_per_op': ns, 'loops': loops}
+
+    for name, fn in sync_cases().items():
+        def run_loops(n, fn=fn):
+            started = time.perf_counter()
+            for _ in range(n):
+                fn()
+            return time.perf_counter() - started
+        record(name, run_loops)
+
+    loop, cases = async_cases()
+    try:
+        for name, make in cases.items():
+            async def run_async(n, make=make):
+                started = time.perf_counter()
+                for _ in range(n):
+                    await make()
+                return time.perf_counter() - started
+            record(name, lambda n, run_async=run_async: loop.run_until_complete(run_async(n)))
+    finally:
+        loop.close()
+
+    reference = results['calibration']['ns_per_op']
+    for stats in results.values():
+        stats['relative'] = stats['ns_per_op'] / reference
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if name == 'calibration' or before is None:
+            continue
+        if stats['relative'] > before['relative'] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {before['relative']:.2f}x -> {stats['relative']:.2f}x calibration "
+                f"({stats['ns_per_op']:.0f} ns/op)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for per-request hot paths")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--save', action='store_true', help="overwrite the baseline with these results")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+    parser.add_argument('--tolerance', type=float, default=0.3, help="allowed slowdown as a fraction")
+    parser.add_argument('--filter', help="only run cases whose name contains this")
+    args = parser.parse_args()
+
+    results = run(args.filter)
+    print(f"{'case':<36}{'ns/op':>12}{'x calib':>10}")
+    for name, stats in results.items():
+        print(f"{name:<36}{stats['ns_per_op']:>12.0f}{stats['relative']:>10.2f}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+    baseline_path = Path(args.baseline)
+    if args.save:
+        baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+        print(f"\nSaved baseline to {baseline_path}")
+        return
+    if baseline_path.exists():
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {baseline_path} (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {baseline_path} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
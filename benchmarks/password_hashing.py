@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Password hashing benchmark
+Reports login verifications per second, overall and per core, for the
+current PASSWORD_* cost settings.
+
+Usage: python benchmarks/password_hashing.py [--logins 200] [--workers N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from password_hasher import get_context, password_hasher_from_env
+
+
+async def run(logins: int):
+    hasher = password_hasher_from_env()
+    stored = await hasher.hash('MinhaSenh@123')
+
+    # Single verify on the loop thread, to show the cost per login
+    started = time.perf_counter()
+    get_context().verify('MinhaSenh@123', stored)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[hasher.verify('MinhaSenh@123', stored) for _ in range(logins)])
+    elapsed = time.perf_counter() - started
+    hasher.close()
+
+    assert all(ok for ok, _ in results)
+    workers = hasher.executor._max_workers
+    rate = logins / elapsed
+    print(f"Hash: {stored.split('$')[1]} {stored.split('$')[3]}")
+    print(f"Single verify: {single * 1000:.1f}ms")
+    print(f"{logins} logins on {workers} workers in {elapsed:.2f}s")
+    print(f"Logins/sec: {rate:.1f}")
+    print(f"Logins/sec per core: {rate / min(workers, os.cpu_count() or 1):.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--workers', type=int, help="overrides PASSWORD_HASH_WORKERS")
+    args = parser.parse_args()
+    if args.workers:
+        os.environ['PASSWORD_HASH_WORKERS'] = str(args.workers)
+    asyncio.run(run(args.logins))
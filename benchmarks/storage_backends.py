@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Storage backend benchmark
+Runs the API's data access patterns (register, login lookup, password
+reset, chat history, workout library, status page) against each storage
+backend and reports latency per operation, so the stores can be compared
+on the same workload.
+
+Usage: python benchmarks/storage_backends.py [--backends mysql mongo] [--users 200]
+                                             [--messages 50] [--concurrency 20] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parent.parent / 'backend' / '.env')
+
+from storage import storage_from_env
+
+
+class Timings:
+    def __init__(self):
+        self.samples = {}
+
+    async def measure(self, name, awaitable):
+        started = time.perf_counter()
+        result = await awaitable
+        self.samples.setdefault(name, []).append(time.perf_counter() - started)
+        return result
+
+    def summary(self):
+        result = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[name] = {
+                'count': len(samples),
+                'mean_ms': statistics.mean(samples) * 1000,
+                'p50_ms': ordered[len(ordered) // 2] * 1000,
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            }
+        return result
+
+
+async def gather_limited(concurrency, coroutines):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*[run(c) for c in coroutines])
+
+
+async def workload(db, users: int, messages: int, concurrency: int) -> dict:
+    timings = Timings()
+    run_id = uuid.uuid4().hex[:8]
+    now = datetime.utcnow()
+    user_rows = [
+        {'id': str(uuid.uuid4()), 'name': f'Bench {i}', 'email': f'bench-{run_id}-{i}@example.com',
+         'password': 'x' * 97, 'created_at': now.isoformat()}
+        for i in range(users)
+    ]
+
+    # Register, then look users up by email as login does
+    await gather_limited(concurrency, [timings.measure('insert user', db.insert_one('users', dict(u))) for u in user_rows])
+    await gather_limited(concurrency, [
+        timings.measure('find user by email', db.find_one('users', {'email': u['email']})) for u in user_rows
+    ])
+
+    # Forgot password -> validate -> reset
+    tokens = [uuid.uuid4().hex for _ in user_rows]
+    await gather_limited(concurrency, [
+        timings.measure('insert reset token', db.insert_one('password_reset_tokens', {
+            'user_id': u['id'], 'token': t, 'expires_at': (now + timedelta(hours=1)).isoformat(),
+            'used': False, 'created_at': now.isoformat(),
+        }))
+        for u, t in zip(user_rows, tokens)
+    ])
+    await gather_limited(concurrency, [
+        timings.measure('find valid token', db.find_one(
+            'password_reset_tokens', {'token': t, 'used': False, 'expires_at >': datetime.utcnow()},
+        ))
+        for t in tokens
+    ])
+
+    async def reset(user, token):
+        async with db.transaction() as tx:
+            await tx.update_one(
+                'password_reset_tokens',
+                {'token': token, 'used': False, 'expires_at >': datetime.utcnow()}, {'used': True},
+            )
+            await tx.update_one('users', {'id': user['id']}, {'password': 'y' * 97})
+
+    await gather_limited(concurrency, [timings.measure('reset password', reset(u, t)) for u, t in zip(user_rows, tokens)])
+
+    # One chat session per user, written in a batch, then read back newest page first
+    sessions = {u['id']: f'bench-{run_id}-{u["id"]}' for u in user_rows}
+    await gather_limited(concurrency, [
+        timings.measure('insert chat batch', db.insert_many('chat_messages', [
+            {'session_id': sessions[u['id']], 'user_id': u['id'], 'message': f'pergunta {i}',
+             'response': f'resposta {i} ' * 20, 'timestamp': (now + timedelta(seconds=i)).isoformat()}
+            for i in range(messages)
+        ]))
+        for u in user_rows
+    ])
+    await gather_limited(concurrency, [
+        timings.measure('chat history page', db.find_many(
+            'chat_messages', {'session_id': s}, order_by='timestamp', descending=True, limit=20,
+        ))
+        for s in sessions.values()
+    ])
+
+    # Workout library newest first
+    await gather_limited(concurrency, [
+        timings.measure('insert workout', db.insert_one('workouts', {
+            'user_id': u['id'], 'title': f'Treino {i}', 'category': 'forca',
+            'exercises': json.dumps([{'name': 'Agachamento', 'sets': 3, 'reps': 10}]),
+            'duration': '45 min', 'difficulty': 'medio', 'created_by_ai': False,
+            'created_at': (now + timedelta(seconds=i)).isoformat(),
+        }))
+        for u in user_rows for i in range(5)
+    ])
+    await gather_limited(concurrency, [
+        timings.measure('workouts page', db.find_many(
+            'workouts', {'user_id': u['id']}, order_by='created_at', descending=True, limit=100,
+        ))
+        for u in user_rows
+    ])
+
+    # Status page
+    status_client = f'bench-{run_id}'
+    await gather_limited(concurrency, [
+        timings.measure('insert status', db.insert_one('status_checks', {
+            'client_name': status_client, 'timestamp': now.isoformat(),
+        }))
+        for _ in range(users)
+    ])
+    await gather_limited(concurrency, [
+        timings.measure('status page', db.find_many('status_checks', order_by='timestamp', limit=100))
+        for _ in range(users)
+    ])
+
+    # Clean up what this run created
+    await db.delete_many('status_checks', {'client_name': status_client})
+    for u in user_rows:
+        await db.delete_many('chat_messages', {'user_id': u['id']})
+        await db.delete_many('workouts', {'user_id': u['id']})
+        await db.delete_many('password_reset_tokens', {'user_id': u['id']})
+        await db.delete_one('users', {'id': u['id']})
+
+    return timings.summary()
+
+
+async def run(backends, users: int, messages: int, concurrency: int):
+    results = {}
+    for backend in backends:
+        os.environ['STORAGE_BACKEND'] = backend
+        db = storage_from_env()
+        try:
+            await db.connect()
+            await db.migrate()
+            started = time.perf_counter()
+            results[backend] = await workload(db, users, messages, concurrency)
+            print(f"\n{backend}: workload took {time.perf_counter() - started:.2f}s")
+        finally:
+            await db.close()
+        print(f"{'operation':<22}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, stats in results[backend].items():
+            print(f"{name:<22}{stats['count']:>8}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare storage backends on the API's workload")
+    parser.add_argument('--backends', nargs='+', default=['mysql', 'mongo'])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=50, help="chat messages per session")
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.backends, args.users, args.messages, args.concurrency))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
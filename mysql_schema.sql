@@ -1,5 +1,7 @@
 -- MySQL Database Schema for Fitness App
 -- Converted from Supabase PostgreSQL schema
+-- Reference copy: the backend applies backend/migrations/ at startup
+-- (or run `python backend/migrate.py`); add schema changes there.
 
 -- Use the database
 USE fitness_app;
@@ -60,9 +62,13 @@ CREATE TABLE IF NOT EXISTS workouts (
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_token ON password_reset_tokens(token);
 CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_user_id ON password_reset_tokens(user_id);
-CREATE INDEX IF NOT EXISTS idx_chat_messages_session_id ON chat_messages(session_id);
+CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_lookup ON password_reset_tokens(token, used, expires_at);
+CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_expires_at ON password_reset_tokens(expires_at);
+CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_used ON password_reset_tokens(used);
+CREATE INDEX IF NOT EXISTS idx_chat_messages_session_timestamp ON chat_messages(session_id, timestamp);
 CREATE INDEX IF NOT EXISTS idx_chat_messages_user_id ON chat_messages(user_id);
-CREATE INDEX IF NOT EXISTS idx_workouts_user_id ON workouts(user_id);
+CREATE INDEX IF NOT EXISTS idx_workouts_user_created_at ON workouts(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_status_checks_timestamp ON status_checks(timestamp);
 
 -- Insert sample data for testing (optional)
 INSERT INTO users (name, email, password) VALUES 
@@ -4,6 +4,7 @@ MySQL Connection Test Script
 Tests the MySQL connection and basic database operations
 """
 
+import asyncio
 import sys
 import os
 sys.path.append('/app/backend')
@@ -11,7 +12,7 @@ sys.path.append('/app/backend')
 from mysql_client import mysql_client
 from datetime import datetime
 
-def test_mysql_connection():
+async def test_mysql_connection():
     """Test MySQL connection and basic operations"""
     try:
         print("🔍 Testing MySQL Connection...")
@@ -23,12 +24,12 @@ def test_mysql_connection():
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        insert_id = mysql_client.insert_one('status_checks', test_data)
+        insert_id = await mysql_client.insert_one('status_checks', test_data)
         print(f"   ✓ Inserted record with ID: {insert_id}")
         
         # Test 2: Find the inserted record
         print("\n✅ Test 2: Find Test Data")
-        found_record = mysql_client.find_one('status_checks', {'id': insert_id})
+        found_record = await mysql_client.find_one('status_checks', {'id': insert_id})
         if found_record:
             print(f"   ✓ Found record: {found_record['client_name']}")
         else:
@@ -36,7 +37,7 @@ def test_mysql_connection():
         
         # Test 3: Count records
         print("\n✅ Test 3: Count Records")
-        count = mysql_client.count('status_checks')
+        count = await mysql_client.count('status_checks')
         print(f"   ✓ Total records in status_checks: {count}")
         
         # Test 4: Test all tables
@@ -44,7 +45,7 @@ def test_mysql_connection():
         tables = ['users', 'status_checks', 'password_reset_tokens', 'chat_messages', 'workouts']
         for table in tables:
             try:
-                count = mysql_client.count(table)
+                count = await mysql_client.count(table)
                 print(f"   ✓ {table}: {count} records")
             except Exception as e:
                 print(f"   ❌ {table}: Error - {e}")
@@ -58,12 +59,12 @@ def test_mysql_connection():
             'created_at': datetime.utcnow().isoformat()
         }
         
-        user_id = mysql_client.insert_one('users', user_data)
+        user_id = await mysql_client.insert_one('users', user_data)
         print(f"   ✓ Created user with ID: {user_id}")
         
         # Test 6: Test user retrieval
         print("\n✅ Test 6: Test User Retrieval")
-        user = mysql_client.find_one('users', {'email': 'test@mysql.com'})
+        user = await mysql_client.find_one('users', {'email': 'test@mysql.com'})
         if user:
             print(f"   ✓ Found user: {user['name']} ({user['email']})")
         else:
@@ -75,7 +76,9 @@ def test_mysql_connection():
     except Exception as e:
         print(f"\n❌ MySQL test failed: {e}")
         return False
+    finally:
+        await mysql_client.close()
 
 if __name__ == "__main__":
-    success = test_mysql_connection()
+    success = asyncio.run(test_mysql_connection())
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,21 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+# The app runs in process on the embedded store; set before server is imported
+os.environ['STORAGE_BACKEND'] = 'memory'
+os.environ['MIGRATE_ON_STARTUP'] = 'false'
+
+
+@pytest.fixture(scope='session')
+def client():
+    from fastapi.testclient import TestClient
+    from server import app
+
+    # One app for the session: shutdown closes the password hashing executor
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,28 @@
+import pytest
+
+from auth_tokens import TokenError, TokenService
+
+
+@pytest.fixture
+def service():
+    return TokenService('test-secret-at-least-32-bytes-long!')
+
+
+def test_access_token_is_not_accepted_as_refresh(service):
+    token = service.issue_access('u1', name='Maria')
+    with pytest.raises(TokenError):
+        service.verify(token, token_type='refresh')
+
+
+def test_cached_access_token_is_not_accepted_as_refresh(service):
+    token = service.issue_access('u1', name='Maria')
+    # Using the token on a protected route puts it in the verified cache
+    assert service.verify(token)['sub'] == 'u1'
+    with pytest.raises(TokenError):
+        service.verify(token, token_type='refresh')
+
+
+def test_refresh_token_keeps_name(service):
+    claims = service.verify(service.issue_refresh('u1', name='Maria'), token_type='refresh')
+    assert claims['sub'] == 'u1'
+    assert claims['name'] == 'Maria'
@@ -0,0 +1,136 @@
+import uuid
+
+
+def register(client, email, password='Secret123'):
+    response = client.post('/api/register', json={'name': 'Maria', 'email': email, 'password': password})
+    assert response.status_code == 200, response.text
+    return response.json()['user_id']
+
+
+def login(client, email, password):
+    return client.post('/api/login', json={'email': email, 'password': password})
+
+
+def unique_email():
+    return f'user-{uuid.uuid4().hex[:12]}@example.com'
+
+
+def test_register_rejects_duplicate_email_in_any_case(client):
+    email = unique_email()
+    register(client, email)
+    response = client.post('/api/register', json={'name': 'Maria', 'email': email.upper(), 'password': 'x'})
+    assert response.status_code == 400
+
+
+def test_login(client):
+    email = unique_email()
+    user_id = register(client, email)
+    response = login(client, email, 'Secret123')
+    assert response.status_code == 200
+    assert response.json()['user_id'] == user_id
+    assert login(client, email, 'wrong').status_code == 401
+    assert login(client, unique_email(), 'Secret123').status_code == 401
+
+
+def test_reset_password(client):
+    email = unique_email()
+    register(client, email)
+    link = client.post('/api/forgot-password', json={'email': email}).json()['reset_link']
+    token = link.split('token=', 1)[1]
+    body = {'token': token, 'new_password': 'NewSecret456', 'confirm_password': 'NewSecret456'}
+    assert client.post('/api/reset-password', json=body).status_code == 200
+    # The token is single use
+    assert client.post('/api/reset-password', json=body).status_code == 400
+    assert login(client, email, 'NewSecret456').status_code == 200
+    assert login(client, email, 'Secret123').status_code == 401
+
+
+def test_workouts_are_paginated(client):
+    user_id = register(client, unique_email())
+    workouts = [
+        {'user_id': user_id, 'title': f'Treino {i}', 'category': 'forca', 'duration': '45 min',
+         'difficulty': 'medio', 'exercises': []}
+        for i in range(5)
+    ]
+    saved = client.post('/api/workouts/batch', json=workouts).json()['workout_ids']
+
+    seen, cursor = [], None
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        response = client.get(f'/api/workouts/{user_id}', params=params)
+        assert response.status_code == 200
+        seen.extend(row['id'] for row in response.json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(saved)
+
+
+def test_cursor_round_trips_across_pages(client):
+    from server import decode_cursor, encode_cursor
+
+    name = f'cursor-{uuid.uuid4().hex[:8]}'
+    created = client.post('/api/status/batch', json=[{'client_name': name} for _ in range(5)]).json()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        response = client.get('/api/status', params=params)
+        assert response.status_code == 200
+        seen.extend(row['id'] for row in response.json())
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        key = decode_cursor(cursor)
+        assert encode_cursor(key) == cursor
+    assert pages > 1
+    assert len(seen) == len(set(seen))
+    assert {row['id'] for row in created} <= set(seen)
+
+
+def test_malformed_cursor_is_rejected(client):
+    from server import encode_cursor
+
+    for key in ([{}, []], ['2026-01-01T00:00:00', 5], [True, 'id']):
+        cursor = encode_cursor(key)
+        assert client.get('/api/status', params={'cursor': cursor}).status_code == 400
+    assert client.get('/api/status', params={'cursor': 'not-base64!'}).status_code == 400
+
+
+def test_reset_password_evicts_every_spelling_of_the_email(client):
+    email = unique_email()
+    mixed = email.capitalize()
+    register(client, email)
+    # Both spellings reach the same user and warm the cache
+    assert login(client, mixed, 'Secret123').status_code == 200
+    assert login(client, email, 'Secret123').status_code == 200
+
+    link = client.post('/api/forgot-password', json={'email': mixed}).json()['reset_link']
+    body = {'token': link.split('token=', 1)[1], 'new_password': 'NewSecret456', 'confirm_password': 'NewSecret456'}
+    assert client.post('/api/reset-password', json=body).status_code == 200
+
+    for spelling in (email, mixed):
+        assert login(client, spelling, 'Secret123').status_code == 401
+        assert login(client, spelling, 'NewSecret456').status_code == 200
+
+
+def test_chat_history_requires_a_token_and_only_returns_own_messages(client, monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, 'AUTH_REQUIRED', True)
+    session_id = str(uuid.uuid4())
+    headers = {}
+    for email in (unique_email(), unique_email()):
+        register(client, email)
+        body = login(client, email, 'Secret123').json()
+        headers[body['user_id']] = {'Authorization': f"Bearer {body['access_token']}"}
+        response = client.post('/api/chat', headers=headers[body['user_id']],
+                               json={'session_id': session_id, 'user_id': body['user_id'], 'message': 'Oi'})
+        assert response.status_code == 200
+
+    assert client.get(f'/api/chat/{session_id}').status_code == 401
+    for user_id, auth in headers.items():
+        for params in ({}, {'stream': 'json'}):
+            rows = client.get(f'/api/chat/{session_id}', headers=auth, params=params).json()
+            assert [row['user_id'] for row in rows] == [user_id]
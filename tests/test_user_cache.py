@@ -0,0 +1,49 @@
+import asyncio
+
+from memory_store import MemoryStorage
+from user_cache import UserCache
+
+
+class SlowReads(MemoryStorage):
+    """Memory store whose find_one returns what it read only after `release` is set"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def find_one(self, table, filter_dict):
+        row = await super().find_one(table, filter_dict)
+        await self.release.wait()
+        return row
+
+
+def test_lookup_racing_an_invalidation_does_not_cache_the_old_row():
+    async def run():
+        db = SlowReads()
+        cache = UserCache(db)
+        await db.insert_one('users', {'id': 'u1', 'name': 'Maria', 'email': 'maria@example.com', 'password': 'old'})
+
+        lookup = asyncio.create_task(cache.get_by_email('Maria@example.com'))
+        await asyncio.sleep(0)
+        # The password changes while the lookup still holds the old row
+        await db.update_one('users', {'id': 'u1'}, {'password': 'new'})
+        db.release.set()
+        await lookup
+
+        entry = await cache.get_by_email('Maria@example.com')
+        assert cache.legacy_password_matches(entry, 'new')
+
+    asyncio.run(run())
+
+
+def test_spellings_of_an_email_share_one_entry():
+    async def run():
+        db = MemoryStorage()
+        cache = UserCache(db)
+        await db.insert_one('users', {'id': 'u1', 'name': 'Maria', 'email': 'maria@example.com', 'password': 'old'})
+        await cache.get_by_email('Maria@Example.com')
+        await cache.get_by_email('maria@example.com')
+        assert cache.stats()['entries'] == 1
+        assert cache.misses == 1
+
+    asyncio.run(run())
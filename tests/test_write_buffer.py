@@ -0,0 +1,81 @@
+import asyncio
+import logging
+
+from storage import DatabaseError
+from write_buffer import WriteBehindBuffer
+
+FOREIGN_KEY = 1452
+LOST_CONNECTION = 2013
+
+
+class FakeClient:
+    """Records written rows; rows marked 'bad' break a foreign key, `down` loses the connection"""
+
+    def __init__(self):
+        self.rows = []
+        self.down = False
+
+    def _check(self, row):
+        if self.down:
+            raise DatabaseError("Database error: Lost connection", LOST_CONNECTION)
+        if row.get('bad'):
+            raise DatabaseError("Database error: foreign key constraint fails", FOREIGN_KEY)
+
+    async def insert_many(self, table, rows):
+        for row in rows:
+            self._check(row)
+        self.rows.extend(rows)
+
+    async def insert_one(self, table, row):
+        self._check(row)
+        self.rows.append(row)
+
+
+def test_rejected_row_is_dropped_and_the_rest_written():
+    client = FakeClient()
+    buffer = WriteBehindBuffer(client, 'chat_messages', max_batch_size=5)
+
+    async def run():
+        for i in range(8):
+            await buffer.add({'id': str(i), 'bad': i == 2})
+        await buffer.flush()
+
+    asyncio.run(run())
+    assert [row['id'] for row in client.rows] == ['0', '1', '3', '4', '5', '6', '7']
+    assert buffer.depth == 0
+    assert buffer.dropped_rows == 1
+
+
+def test_transient_error_keeps_rows_queued_in_order():
+    client = FakeClient()
+    client.down = True
+    buffer = WriteBehindBuffer(client, 'chat_messages', max_batch_size=2)
+
+    async def run():
+        for i in range(5):
+            await buffer.add({'id': str(i)})
+        await buffer.flush()
+        assert [row['id'] for row in buffer._rows] == ['0', '1', '2', '3', '4']
+        client.down = False
+        await buffer.flush()
+
+    asyncio.run(run())
+    assert buffer.dropped_rows == 0
+    assert [row['id'] for row in client.rows] == ['0', '1', '2', '3', '4']
+    assert buffer.depth == 0
+
+
+def test_stop_logs_rows_it_abandons(caplog):
+    client = FakeClient()
+    client.down = True
+    buffer = WriteBehindBuffer(client, 'chat_messages')
+
+    async def run():
+        buffer.start()
+        for i in range(3):
+            await buffer.add({'id': str(i)})
+        await buffer.stop()
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(run())
+    assert 'Abandoning 3 rows for chat_messages' in caplog.text